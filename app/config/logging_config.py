@@ -0,0 +1,108 @@
+"""Central logging setup.
+
+Records are formatted as JSON (or plain text with LOG_FORMAT=text) and
+written by a QueueListener thread, so the event loop only pays for putting
+the record on a queue. Every record carries the current request ID.
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+
+request_id_var: ContextVar = ContextVar("request_id", default=None)
+
+_listener = None
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the request ID of the request being handled"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Merge args now (they may be mutated later) but leave the final
+        # formatting to the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def setup_logging(level: str = None, fmt: str = None, stream=None):
+    """Install the queue-based handler on the root logger. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if (fmt or LOG_FORMAT) == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level or LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def log_sampled(logger: logging.Logger, level: int, msg: str, *args, rate: float = None):
+    """Log only a fraction of calls, for messages on hot paths.
+
+    The level check comes first, so a disabled level costs one comparison.
+    """
+    if logger.isEnabledFor(level) and random.random() < (LOG_SAMPLE_RATE if rate is None else rate):
+        logger.log(level, msg, *args)
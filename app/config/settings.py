@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 from pathlib import Path
 import os
+import json
 
 # Load environment variables
 load_dotenv()
@@ -11,11 +12,84 @@ if not MONGODB_URI:
     raise ValueError("MONGODB_URI environment variable not set")
 
 DB_NAME = os.getenv("DB_NAME", "carbrands")  # Default okay for DB_NAME
+MONGODB_TLS = os.getenv("MONGODB_TLS", "true").lower() != "false"  # Disable only for local mongod
+
+# Booking slot settings
+SLOT_DEFAULT_CAPACITY = int(os.getenv("SLOT_DEFAULT_CAPACITY", "4"))
+SLOT_TIMES = [
+    t.strip() for t in os.getenv(
+        "SLOT_TIMES",
+        "09:00 AM,10:00 AM,11:00 AM,12:00 PM,01:00 PM,02:00 PM,03:00 PM,04:00 PM,05:00 PM,06:00 PM"
+    ).split(",") if t.strip()
+]
+# Time zone of slot dates, for centers without their own "timezone"
+SLOT_TZ = os.getenv("SLOT_TZ", "Asia/Kolkata")
+# Centers accepted for bookings besides those in the service_centers collection.
+# With neither configured, any center name is accepted.
+SERVICE_CENTERS = [c.strip() for c in os.getenv("SERVICE_CENTERS", "").split(",") if c.strip()]
+
+# Time zone used to cut daily/weekly analytics buckets
+ANALYTICS_TZ = os.getenv("ANALYTICS_TZ", "Asia/Kolkata")
+
+# Live admin feed: "local" publishes from this worker's handlers, "changestream" follows the
+# database so every worker's dashboards see every event (needs a replica set)
+EVENT_STREAM_SOURCE = os.getenv("EVENT_STREAM_SOURCE", "local")
+EVENT_STREAM_QUEUE_SIZE = int(os.getenv("EVENT_STREAM_QUEUE_SIZE", "100"))
+EVENT_STREAM_MAX_CLIENTS = int(os.getenv("EVENT_STREAM_MAX_CLIENTS", "200"))
+
+# Rate limits for public write endpoints: {path: {"ip": [requests, seconds], "phone": [requests, seconds]}}
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false"
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")  # "memory" or "mongo" (shared across workers)
+# Reverse proxies in front of the app that append to X-Forwarded-For (e.g. 1 behind a single
+# load balancer). 0 ignores the header, which clients can set to anything, and uses the peer address.
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
+RATE_LIMITS = json.loads(os.getenv("RATE_LIMITS", "null") or "null") or {
+    "/car/submit-request": {"ip": [10, 60], "phone": [3, 600]},
+    "/api/submit-booking": {"ip": [10, 60], "phone": [5, 600]},
+    "/api/submit-insurance-request": {"ip": [10, 60], "phone": [3, 600]},
+}
+
+# Cross-worker cache invalidation: "auto" (change streams when on a replica set, else polling),
+# "changestream", "poll" or "off"
+CACHE_BUS_MODE = os.getenv("CACHE_BUS_MODE", "auto")
+CACHE_POLL_INTERVAL = float(os.getenv("CACHE_POLL_INTERVAL", "2"))
+# Catalog read caches: served fresh for CATALOG_CACHE_TTL seconds, then served stale while
+# one background refresh runs, up to CATALOG_CACHE_STALE_TTL seconds
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "30"))
+CATALOG_CACHE_STALE_TTL = float(os.getenv("CATALOG_CACHE_STALE_TTL", "300"))
+# Admin listings and analytics read from secondaries at most this many seconds behind
+# the primary (MongoDB requires at least 90)
+REPORTING_MAX_STALENESS = max(90, int(os.getenv("REPORTING_MAX_STALENESS", "120")))
 
 # Media settings
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
+# Small media files are kept in memory, up to MEDIA_CACHE_MAX_BYTES in total
+MEDIA_CACHE_MAX_BYTES = int(os.getenv("MEDIA_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+MEDIA_CACHE_MAX_FILE_BYTES = int(os.getenv("MEDIA_CACHE_MAX_FILE_BYTES", str(256 * 1024)))
+
+# Archival of closed leads and bookings out of the hot collections
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_MODE = os.getenv("ARCHIVE_MODE", "collection")  # "collection" (<name>_archive) or "ndjson" (gzip files)
+ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", str(BASE_DIR / "archive")))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+# Statuses that make a record eligible; null archives every record past the age
+ARCHIVE_STATUSES = json.loads(os.getenv("ARCHIVE_STATUSES", "null") or "null") or {
+    "bookings": ["completed", "cancelled"],
+    "insurance_requests": ["closed", "completed", "rejected"],
+    "requests": None,
+}
+
+# Profiling: per-request profiles (admin-only, opt-in per request) and the background sampler
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles")))
+PROFILE_REQUEST_INTERVAL_MS = float(os.getenv("PROFILE_REQUEST_INTERVAL_MS", "2"))
+PROFILE_SAMPLER_HZ = float(os.getenv("PROFILE_SAMPLER_HZ", "0"))  # 0 disables the background sampler
+PROFILE_SAMPLER_MAX_OVERHEAD = float(os.getenv("PROFILE_SAMPLER_MAX_OVERHEAD", "0.01"))
+PROFILE_SAMPLER_FLUSH_SECONDS = float(os.getenv("PROFILE_SAMPLER_FLUSH_SECONDS", "60"))
+# Sampler files kept in PROFILE_DIR; the oldest are deleted beyond either limit
+PROFILE_SAMPLER_MAX_FILES = int(os.getenv("PROFILE_SAMPLER_MAX_FILES", "100"))
+PROFILE_SAMPLER_MAX_BYTES = int(os.getenv("PROFILE_SAMPLER_MAX_BYTES", str(50 * 1024 * 1024)))
 
 class Settings:
     MONGODB_URI = MONGODB_URI
@@ -1,23 +1,29 @@
 from pymongo import MongoClient
+from pymongo.read_preferences import SecondaryPreferred
 from app.config import settings
+from app.services.profiler import command_timer
 import logging
 import certifi
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def get_db_connection():
     """Create and return a secure MongoDB connection"""
     try:
+        tls_options = {
+            "tls": True,
+            "tlsCAFile": certifi.where(),
+            "tlsAllowInvalidCertificates": False,  # Explicitly set to False for security
+        } if settings.MONGODB_TLS else {}
         client = MongoClient(
             settings.MONGODB_URI,
-            tls=True,
-            tlsCAFile=certifi.where(),
-            tlsAllowInvalidCertificates=False,  # Explicitly set to False for security
+            **tls_options,
             connectTimeoutMS=10000,  # Increased connection timeout
             socketTimeoutMS=30000,   # Increased socket timeout
             retryWrites=True,
-            w="majority"
+            w="majority",
+            tz_aware=True,  # Timestamps are stored in UTC; return them as aware datetimes
+            event_listeners=[command_timer]  # Only records anything for profiled requests
         )
         
         # Test connection with a shorter timeout
@@ -28,5 +34,19 @@ def get_db_connection():
         logger.error(f"❌ MongoDB connection failed: {e}")
         raise
 
-# Initialize connection
-db = get_db_connection()
\ No newline at end of file
+def get_reporting_db(database):
+    """The same database, reading from secondaries within REPORTING_MAX_STALENESS.
+
+    Shares the client (and its connection pools) with ``database``. Falls back
+    to the primary when no secondary is fresh enough or there is no replica set.
+    """
+    return database.client.get_database(
+        database.name,
+        read_preference=SecondaryPreferred(max_staleness=settings.REPORTING_MAX_STALENESS)
+    )
+
+# Initialize connection. Routers pick a profile explicitly:
+# db for customer traffic and anything read before a write (primary),
+# reporting_db for admin listings, dashboard counts and analytics.
+db = get_db_connection()
+reporting_db = get_reporting_db(db)
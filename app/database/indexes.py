@@ -0,0 +1,37 @@
+from pymongo import ASCENDING, DESCENDING
+from app.database.connection import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+def ensure_indexes():
+    """Create the indexes the read paths rely on. Safe to call repeatedly."""
+    try:
+        db.package_prices.create_index(
+            [("package_id", ASCENDING), ("brand_key", ASCENDING),
+             ("model_key", ASCENDING), ("fuel", ASCENDING)],
+            unique=True,
+            name="package_brand_model_fuel"
+        )
+        db.package_prices.create_index(
+            [("brand_key", ASCENDING), ("model_key", ASCENDING), ("fuel", ASCENDING)],
+            name="brand_model_fuel"
+        )
+        db.slot_counters.create_index(
+            [("center_key", ASCENDING), ("date", ASCENDING)],
+            name="center_date"
+        )
+        for name in ("bookings", "requests", "insurance_requests"):
+            db[name].create_index([("createdAt", DESCENDING)], name="createdAt")
+            db[f"{name}_archive"].create_index([("createdAt", DESCENDING)], name="createdAt")
+            # Keyset paging of admin listings (createdAt, _id)
+            for coll in (name, f"{name}_archive"):
+                db[coll].create_index([("createdAt", DESCENDING), ("_id", DESCENDING)], name="createdAt_id")
+        db.bookings.create_index([("status", ASCENDING), ("createdAt", DESCENDING)], name="status_createdAt")
+        db.booking_rollups.create_index(
+            [("granularity", ASCENDING), ("dimension", ASCENDING), ("period", ASCENDING)],
+            name="granularity_dimension_period"
+        )
+        db.service_centers.create_index([("key", ASCENDING)], unique=True, name="key")
+    except Exception as e:
+        logger.error(f"Error creating indexes: {str(e)}")
@@ -1,20 +1,58 @@
+from app.config.logging_config import setup_logging
+setup_logging()
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes.car import router as car_router
 from app.config import settings
 from app.routes.service import router as service_router
 from app.routes.booking import router as booking_router
-from app.routes.admin import router as admin_router
+from app.routes.admin import router as admin_router, admin_from_token
 from app.routes.blog import router as blog_router
+from app.database.indexes import ensure_indexes
+from app.database.connection import db
+from app.services.cache_bus import cache_bus
+from app.services.event_bus import event_bus
+from app.middleware.request_id import RequestIdMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.media import MediaFilesMiddleware
+from app.services.profiler import BackgroundSampler
+from app.middleware.rate_limit import RateLimitMiddleware, InMemoryBucketStore, MongoBucketStore
 import os
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+background_sampler = BackgroundSampler(
+    hz=settings.PROFILE_SAMPLER_HZ,
+    max_overhead=settings.PROFILE_SAMPLER_MAX_OVERHEAD,
+    flush_seconds=settings.PROFILE_SAMPLER_FLUSH_SECONDS,
+    output_dir=settings.PROFILE_DIR,
+    max_files=settings.PROFILE_SAMPLER_MAX_FILES,
+    max_bytes=settings.PROFILE_SAMPLER_MAX_BYTES
+) if settings.PROFILE_SAMPLER_HZ > 0 else None
+
 app = FastAPI()
 
+# FIXED: Removed os.makedirs. Vercel is Read-Only.
+# You must use S3, Cloudinary, or Vercel Blob for storage instead of local folders.
+
+# Media files, with fingerprinted URLs cached as immutable. Innermost, so
+# media responses still get CORS and request ID headers.
+if os.path.exists(settings.MEDIA_ROOT):
+    app.add_middleware(MediaFilesMiddleware, prefix=settings.MEDIA_URL)
+    logger.info("Media served from %s", settings.MEDIA_ROOT)
+
+# Rate limiting for public write endpoints. Added before CORS so that
+# CORS wraps it and 429 responses still carry CORS headers.
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limits=settings.RATE_LIMITS,
+        trusted_proxies=settings.RATE_LIMIT_TRUSTED_PROXIES,
+        store=MongoBucketStore(db.rate_limits) if settings.RATE_LIMIT_STORE == "mongo" else InMemoryBucketStore()
+    )
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -36,16 +74,11 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
-# FIXED: Removed os.makedirs. Vercel is Read-Only.
-# You must use S3, Cloudinary, or Vercel Blob for storage instead of local folders.
+# On-demand profiling of single requests by admins (X-Profile: 1)
+app.add_middleware(ProfilingMiddleware, authenticate=admin_from_token)
 
-if os.path.exists(settings.MEDIA_ROOT):
-    app.mount(
-        str(settings.MEDIA_URL), 
-        StaticFiles(directory=str(settings.MEDIA_ROOT)), 
-        name="media"
-    )
-    logger.info(f"Media mounted at {settings.MEDIA_ROOT}")
+# Outermost, so every log record of the request (including 429s) carries its ID
+app.add_middleware(RequestIdMiddleware)
 
 # Include routes
 app.include_router(car_router, prefix="/car", tags=["Car"])
@@ -54,6 +87,24 @@ app.include_router(booking_router, prefix="/api", tags=["Booking"])
 app.include_router(admin_router, prefix="/admin", tags=["Admin"])
 app.include_router(blog_router)
 
+@app.on_event("startup")
+def create_indexes():
+    ensure_indexes()
+
+@app.on_event("startup")
+def start_background_workers():
+    cache_bus.start()
+    event_bus.start()
+    if background_sampler:
+        background_sampler.start()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    cache_bus.stop()
+    event_bus.stop()
+    if background_sampler:
+        background_sampler.stop()
+
 @app.get("/")
 def root():
     return {"status": "API is running on Vercel", "database": "Connected"}
@@ -0,0 +1,129 @@
+import mimetypes
+import re
+from email.utils import formatdate
+
+from starlette.concurrency import run_in_threadpool
+
+from app.services.media_service import media_store, split_version, READ_CHUNK
+
+IMMUTABLE = b"public, max-age=31536000, immutable"
+REVALIDATE = b"no-cache"
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_range(header: str, size: int):
+    """(start, end) inclusive for a single byte range, None to serve the whole
+    file, or False when the range cannot be satisfied"""
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: the full body is a valid answer
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+class MediaFilesMiddleware:
+    """Serve files under MEDIA_URL from MEDIA_ROOT.
+
+    Fingerprinted paths (``/media/_v/<digest>/...``, see media_url) whose
+    digest matches the file are cached by clients for a year as immutable.
+    Plain paths, and fingerprints of content that has since changed, must be
+    revalidated; the content digest is the ETag, so that costs a 304.
+    Single byte ranges are supported. Other requests pass through.
+    """
+
+    def __init__(self, app, prefix: str, store=media_store):
+        self.app = app
+        self.prefix = prefix
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._respond(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+
+        digest, relative_path = split_version(scope["path"][len(self.prefix):])
+        found = await run_in_threadpool(self.store.lookup, relative_path)
+        if found is None:
+            await self._respond(send, 404, [], b"Not Found")
+            return
+        path, stat, current = found
+        etag = f'"{current}"'.encode()
+        headers = [
+            (b"etag", etag),
+            (b"last-modified", formatdate(stat.st_mtime, usegmt=True).encode()),
+            (b"cache-control", IMMUTABLE if digest == current else REVALIDATE),
+            (b"accept-ranges", b"bytes"),
+        ]
+
+        request_headers = dict(scope.get("headers", []))
+        if_none_match = request_headers.get(b"if-none-match")
+        if if_none_match and (if_none_match.strip() == b"*" or etag in [t.strip() for t in if_none_match.split(b",")]):
+            await self._respond(send, 304, headers)
+            return
+
+        content_type, encoding = mimetypes.guess_type(path)
+        headers.append((b"content-type", (content_type or "application/octet-stream").encode()))
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode()))
+
+        size = stat.st_size
+        status, start, end = 200, 0, size - 1
+        range_header = request_headers.get(b"range")
+        if_range = request_headers.get(b"if-range")
+        if range_header and (if_range is None or if_range.strip() == etag):
+            byte_range = parse_range(range_header.decode("latin-1"), size)
+            if byte_range is False:
+                await self._respond(send, 416, headers + [(b"content-range", f"bytes */{size}".encode())])
+                return
+            if byte_range is not None:
+                status, (start, end) = 206, byte_range
+                headers.append((b"content-range", f"bytes {start}-{end}/{size}".encode()))
+        headers.append((b"content-length", str(max(0, end - start + 1)).encode()))
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        content = await run_in_threadpool(self.store.read, path, stat)
+        if content is not None:
+            await send({"type": "http.response.body", "body": content[start:end + 1]})
+            return
+
+        # Large files are streamed from disk
+        f = await run_in_threadpool(open, path, "rb")
+        try:
+            await run_in_threadpool(f.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await run_in_threadpool(f.read, min(READ_CHUNK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            await run_in_threadpool(f.close)
+
+    async def _respond(self, send, status: int, headers: list, body: bytes = b""):
+        if status != 304:
+            headers = headers + [(b"content-length", str(len(body)).encode())]
+        if body:
+            headers.append((b"content-type", b"text/plain; charset=utf-8"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,97 @@
+import json
+import logging
+import re
+import uuid
+from urllib.parse import parse_qs
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.services.profiler import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+class ProfilingMiddleware:
+    """Profile single requests on demand.
+
+    A request is profiled when it carries ``X-Profile: 1`` (or ``?__profile=1``)
+    together with a valid admin bearer token. The profile (stack samples in
+    folded format plus per-command Mongo timings) is written to PROFILE_DIR and
+    its ID returned in the ``X-Profile-Id`` response header; fetch it from
+    ``/admin/profiles/{id}``. Other requests pass straight through.
+    """
+
+    def __init__(self, app, authenticate):
+        self.app = app
+        self.authenticate = authenticate
+
+    def _requested(self, scope) -> bool:
+        headers = dict(scope.get("headers", []))
+        if headers.get(b"x-profile") in (b"1", b"true"):
+            return True
+        query = scope.get("query_string", b"")
+        return b"__profile" in query and parse_qs(query.decode("latin-1")).get("__profile") in (["1"], ["true"])
+
+    def _admin_token(self, scope):
+        authorization = dict(scope.get("headers", [])).get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        return token if scheme.lower() == "bearer" and token else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        token = self._admin_token(scope)
+        try:
+            if token is None:
+                raise HTTPException(status_code=401)
+            await run_in_threadpool(self.authenticate, token)
+        except HTTPException:
+            # Not an admin: serve the request normally, unprofiled
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        profile = RequestProfile(settings.PROFILE_REQUEST_INTERVAL_MS)
+        status = {}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.stop()
+            await run_in_threadpool(profile.join)
+            report = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status.get("code"),
+                **profile.report()
+            }
+            await run_in_threadpool(save_profile, profile_id, report)
+
+def save_profile(profile_id: str, report: dict):
+    try:
+        settings.PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        (settings.PROFILE_DIR / f"{profile_id}.json").write_text(json.dumps(report))
+        logger.info("Saved profile %s for %s (%.1f ms, %d mongo commands)",
+                    profile_id, report["path"], report["wall_ms"], report["mongo"]["count"])
+    except OSError as e:
+        logger.error("Could not save profile %s: %s", profile_id, e)
+
+def load_profile(profile_id: str):
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = settings.PROFILE_DIR / f"{profile_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo import ReturnDocument
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Bodies above this size are not parsed for a phone number
+MAX_BODY_BYTES = 64 * 1024
+
+class InMemoryBucketStore:
+    """Token buckets held in this process. Least recently used keys are evicted past max_keys."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        """Take one token. Returns 0 when allowed, otherwise seconds until a token is available."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = burst
+        else:
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            self._buckets.move_to_end(key)
+
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            wait = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            wait = (1 - tokens) / rate
+
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+class MongoBucketStore:
+    """Token buckets shared by all workers, kept in a MongoDB collection.
+
+    The refill and the take happen in one pipeline update, so concurrent
+    workers cannot both spend the last token.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.collection.create_index("expireAt", expireAfterSeconds=0)
+
+    def _take(self, key: str, rate: float, burst: float) -> float:
+        now = time.time()
+        doc = self.collection.find_one_and_update(
+            {"_id": hashlib.sha1(key.encode()).hexdigest()},
+            [
+                {"$set": {
+                    "tokens": {"$min": [burst, {"$add": [
+                        {"$ifNull": ["$tokens", burst]},
+                        {"$multiply": [{"$subtract": [now, {"$ifNull": ["$ts", now]}]}, rate]}
+                    ]}]},
+                    "ts": now,
+                    "expireAt": datetime.now(timezone.utc) + timedelta(seconds=burst / rate)
+                }},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return 0.0 if doc["allowed"] else (1 - doc["tokens"]) / rate
+
+    async def take(self, key: str, rate: float, burst: float) -> float:
+        return await run_in_threadpool(self._take, key, rate, burst)
+
+def normalize_phone(phone) -> Optional[str]:
+    digits = re.sub(r"\D", "", str(phone or ""))
+    return digits[-10:] if digits else None
+
+class RateLimitMiddleware:
+    """Per-IP and per-phone token buckets for selected POST routes.
+
+    ``limits`` maps a path to ``{"ip": [requests, seconds], "phone": [requests, seconds]}``.
+    Limited requests are answered with 429 before the route (and its database
+    work) runs. The request body is buffered only for routes with a phone limit
+    and replayed to the application unchanged.
+
+    ``trusted_proxies`` is the number of reverse proxies in front of the app.
+    The client IP is then the X-Forwarded-For entry appended by the outermost
+    of them, counted from the right; entries further left are client-supplied
+    and ignored. With 0 the header is ignored entirely.
+    """
+
+    def __init__(self, app, limits: dict, store=None, trusted_proxies: int = 0):
+        self.app = app
+        self.store = store or InMemoryBucketStore()
+        self.trusted_proxies = trusted_proxies
+        self.limits = {}
+        for path, limit in limits.items():
+            self.limits[path] = {
+                kind: (requests / seconds, float(requests))
+                for kind, (requests, seconds) in limit.items()
+            }
+
+    def _client_ip(self, scope) -> str:
+        if self.trusted_proxies > 0:
+            # Repeated headers are one comma-separated list, in order
+            forwarded = [
+                entry.strip()
+                for name, value in scope.get("headers", []) if name == b"x-forwarded-for"
+                for entry in value.decode("latin-1").split(",") if entry.strip()
+            ]
+            if len(forwarded) >= self.trusted_proxies:
+                return forwarded[-self.trusted_proxies]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def _reject(self, scope, receive, send, wait: float, kind: str):
+        logger.warning("Rate limited by %s on %s", kind, scope["path"])
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests, please try again later"},
+            headers={"Retry-After": str(max(1, int(wait + 0.999)))}
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        limit = self.limits.get(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if "ip" in limit:
+            rate, burst = limit["ip"]
+            wait = await self.store.take(f"{scope['path']}:ip:{self._client_ip(scope)}", rate, burst)
+            if wait:
+                await self._reject(scope, receive, send, wait, "ip")
+                return
+
+        if "phone" not in limit:
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the body so the phone number can be read, then replay it
+        messages = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            size += len(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+        if size <= MAX_BODY_BYTES:
+            try:
+                payload = json.loads(b"".join(m.get("body", b"") for m in messages) or b"null")
+                phone = normalize_phone(payload.get("phone")) if isinstance(payload, dict) else None
+            except ValueError:
+                phone = None
+            if phone:
+                rate, burst = limit["phone"]
+                wait = await self.store.take(f"{scope['path']}:phone:{phone}", rate, burst)
+                if wait:
+                    await self._reject(scope, receive, send, wait, "phone")
+                    return
+
+        pending = iter(messages)
+
+        async def replay():
+            message = next(pending, None)
+            if message is not None:
+                return message
+            return await receive()
+
+        await self.app(scope, replay, send)
@@ -0,0 +1,54 @@
+"""Rebuild booking_rollups from the bookings collection.
+
+Run once after utc_timestamps to backfill analytics for existing bookings;
+from then on the rollups are maintained incrementally by the API. The
+rollups are rebuilt into a staging collection and swapped in at the end,
+so the admin analytics keep serving the old numbers while this runs.
+Bookings written while it runs are not included: run it at a quiet time.
+
+    python -m app.migrations.booking_rollups [--batch-size 5000]
+"""
+import argparse
+import logging
+from app.config.logging_config import setup_logging
+from app.database.connection import db
+from app.database.indexes import ensure_indexes
+from app.services.analytics_service import accumulate, booking_created_deltas, flush
+
+logger = logging.getLogger(__name__)
+
+STAGING = "booking_rollups_rebuild"
+
+def rebuild(batch_size: int = 5000) -> int:
+    db[STAGING].drop()
+    projection = {"_id": 0, "createdAt": 1, "brand": 1, "serviceCenter": 1,
+                  "totalPrice": 1, "status": 1, "cartItems": 1}
+    acc = {}
+    count = 0
+    for booking in db.bookings.find({}, projection).batch_size(batch_size):
+        if booking.get("createdAt") is None:
+            continue
+        try:
+            accumulate(acc, booking["createdAt"], booking_created_deltas(booking))
+        except ValueError:
+            logger.warning(f"Skipping booking with unparseable createdAt: {booking.get('createdAt')}")
+            continue
+        count += 1
+        if count % batch_size == 0:
+            flush(acc, db[STAGING])
+            acc = {}
+            logger.info(f"Rolled up {count} bookings")
+    flush(acc, db[STAGING])
+
+    if count:
+        db[STAGING].rename("booking_rollups", dropTarget=True)
+        ensure_indexes()
+    logger.info(f"Rebuilt booking rollups from {count} bookings")
+    return count
+
+if __name__ == "__main__":
+    setup_logging(fmt="text")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    rebuild(batch_size=args.batch_size)
@@ -0,0 +1,76 @@
+"""Copy embedded ServicePackage.pricing trees into the package_prices collection.
+
+Resumable: progress is checkpointed in the ``migrations`` collection after
+every batch, so an interrupted run picks up after the last finished package.
+The embedded ``pricing`` field is left in place. A package that fails to
+migrate is logged, recorded under ``failed`` and keeps its embedded pricing;
+the run carries on with the next one.
+
+    python -m app.migrations.package_prices [--batch-size 50] [--restart]
+"""
+import argparse
+import logging
+from datetime import datetime, timezone
+from app.config.logging_config import setup_logging
+from app.database.connection import db
+from app.database.indexes import ensure_indexes
+from app.services.cache_bus import cache_bus
+from app.services.pricing_service import sync_or_fall_back
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_ID = "package_prices"
+
+def migrate(batch_size: int = 50, restart: bool = False) -> int:
+    ensure_indexes()
+    if restart:
+        db.migrations.delete_one({"_id": MIGRATION_ID})
+
+    state = db.migrations.find_one({"_id": MIGRATION_ID}) or {}
+    last_id = state.get("lastId")
+    migrated = state.get("packages", 0)
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id else {}
+        batch = list(
+            db.service_packages.find(query, {"_id": 1, "name": 1, "pricing": 1})
+            .sort("_id", 1)
+            .limit(batch_size)
+        )
+        if not batch:
+            break
+
+        failed = []
+        for pkg in batch:
+            if sync_or_fall_back(pkg["_id"], pkg.get("pricing", {})):
+                logger.info(f"Migrated package {pkg.get('name')}")
+            else:
+                failed.append(pkg["_id"])
+
+        last_id = batch[-1]["_id"]
+        migrated += len(batch) - len(failed)
+        db.migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"lastId": last_id, "packages": migrated,
+                      "updatedAt": datetime.now(timezone.utc)},
+             "$addToSet": {"failed": {"$each": failed}}},
+            upsert=True
+        )
+
+    db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {"$set": {"completedAt": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    # Running workers re-read the catalog even when they only poll for changes
+    cache_bus.publish("service_packages")
+    logger.info(f"package_prices migration finished: {migrated} packages")
+    return migrated
+
+if __name__ == "__main__":
+    setup_logging(fmt="text")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--restart", action="store_true")
+    args = parser.parse_args()
+    migrate(batch_size=args.batch_size, restart=args.restart)
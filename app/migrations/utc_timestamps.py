@@ -0,0 +1,53 @@
+"""Convert legacy IST ``createdAt`` strings to UTC datetimes.
+
+Covers bookings, requests and insurance_requests. Only documents whose
+createdAt is still a string are touched, so the migration can be stopped
+and re-run at any time. Values that don't parse fall back to the ObjectId
+timestamp; the original string is kept in ``createdAtLegacy``.
+
+    python -m app.migrations.utc_timestamps [--batch-size 1000]
+"""
+import argparse
+import logging
+from pymongo import UpdateOne
+from app.config.logging_config import setup_logging
+from app.database.connection import db
+from app.services.analytics_service import as_utc
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ["bookings", "requests", "insurance_requests"]
+
+def migrate_collection(name: str, batch_size: int = 1000) -> int:
+    collection = db[name]
+    converted = 0
+    while True:
+        batch = list(collection.find({"createdAt": {"$type": "string"}}, {"createdAt": 1}).limit(batch_size))
+        if not batch:
+            break
+        ops = []
+        for doc in batch:
+            try:
+                ops.append(UpdateOne(
+                    {"_id": doc["_id"], "createdAt": doc["createdAt"]},
+                    {"$set": {"createdAt": as_utc(doc["createdAt"])}}
+                ))
+            except ValueError:
+                ops.append(UpdateOne(
+                    {"_id": doc["_id"], "createdAt": doc["createdAt"]},
+                    {"$set": {"createdAt": doc["_id"].generation_time, "createdAtLegacy": doc["createdAt"]}}
+                ))
+        collection.bulk_write(ops, ordered=False)
+        converted += len(ops)
+        logger.info(f"{name}: converted {converted} timestamps")
+    return converted
+
+def migrate(batch_size: int = 1000) -> dict:
+    return {name: migrate_collection(name, batch_size) for name in COLLECTIONS}
+
+if __name__ == "__main__":
+    setup_logging(fmt="text")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    migrate(batch_size=args.batch_size)
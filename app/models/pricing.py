@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Any
+
+def canonical_key(value: str) -> str:
+    """Lowercase, trimmed key used for brand/model/fuel lookups"""
+    return (value or "").strip().lower()
+
+class PackagePrice(BaseModel):
+    """One row of the normalized package_prices collection.
+
+    Keyed by (package_id, brand_key, model_key, fuel); the original
+    spellings are kept alongside so the legacy pricing tree can be rebuilt.
+    Prices and extras are stored exactly as the embedded tree holds them
+    (it is untyped), so migrated responses match the legacy ones.
+    """
+    package_id: str
+    brand_key: str
+    model_key: str
+    fuel: str
+    brand: str
+    model: str
+    fuelType: str
+    basePrice: Any = 0
+    discountedPrice: Any = 0
+    Extra: Any = ""
+    Extra1: Any = ""
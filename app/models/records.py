@@ -0,0 +1,109 @@
+"""Lightweight read-side records for hot catalog and listing paths.
+
+These are plain ``__slots__`` classes, not Pydantic models: they are built
+straight from projected pymongo documents, without validation, once per
+cache load, and serialized to the same JSON the Pydantic models produced.
+Use the Pydantic models in car.py for request bodies and OpenAPI.
+"""
+import json
+from datetime import datetime
+
+def dumps(value) -> bytes:
+    """Compact UTF-8 JSON, as FastAPI's JSONResponse renders it"""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+class CarModelRecord:
+    __slots__ = ("name", "imageUrl", "fuel_types")
+
+    def __init__(self, name: str, imageUrl: str = None, fuel_types: tuple = ()):
+        self.name = name
+        self.imageUrl = imageUrl
+        self.fuel_types = fuel_types
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "CarModelRecord":
+        return cls(doc["name"], doc.get("imageUrl"), tuple(doc.get("fuel_types") or ()))
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "imageUrl": self.imageUrl, "fuel_types": list(self.fuel_types)}
+
+class CarBrandRecord:
+    __slots__ = ("brand", "logoUrl", "models")
+
+    PROJECTION = {"_id": 0, "brand": 1, "logoUrl": 1, "models.name": 1, "models.imageUrl": 1, "models.fuel_types": 1}
+
+    def __init__(self, brand: str, logoUrl: str = None, models: tuple = ()):
+        self.brand = brand
+        self.logoUrl = logoUrl
+        self.models = models
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "CarBrandRecord":
+        return cls(
+            doc["brand"],
+            doc.get("logoUrl"),
+            tuple(CarModelRecord.from_doc(model) for model in doc.get("models") or ())
+        )
+
+    def to_dict(self) -> dict:
+        return {"brand": self.brand, "logoUrl": self.logoUrl, "models": [model.to_dict() for model in self.models]}
+
+_MISSING = object()
+
+class _DocumentRecord:
+    """Named slots for the known fields of a document, ``extra`` for the rest.
+
+    Fields absent from the document stay absent in ``to_dict``, so the output
+    matches the document it was built from (with ``_id`` as a string).
+    """
+
+    __slots__ = ("id", "extra")
+    FIELDS = ()
+
+    def __init__(self, id: str, fields: dict):
+        """``fields`` holds every other key of the document; it is consumed"""
+        self.id = id
+        for name in self.FIELDS:
+            setattr(self, name, fields.pop(name, _MISSING))
+        self.extra = fields or None
+
+    @classmethod
+    def from_doc(cls, doc: dict):
+        fields = dict(doc)
+        return cls(str(fields.pop("_id")), fields)
+
+    def get(self, name: str, default=None):
+        value = getattr(self, name)
+        return default if value is _MISSING else value
+
+    def to_dict(self, include_id: bool = True) -> dict:
+        out = {"_id": self.id} if include_id else {}
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not _MISSING:
+                out[name] = value
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+class ServicePackageRecord(_DocumentRecord):
+    FIELDS = ("name", "warranty", "interval", "services", "duration", "recommended",
+              "category", "pricing", "pricingMigrated")
+    __slots__ = FIELDS
+
+    def to_priced_dict(self, prices: dict) -> dict:
+        """The package as get_service_packages returns it, priced for one vehicle"""
+        out = self.to_dict(include_id=False)
+        out.pop("pricingMigrated", None)
+        out.update({
+            "price": prices["basePrice"],
+            "discountedPrice": prices["discountedPrice"],
+            "Extra": prices["Extra"],
+            "Extra1": prices["Extra1"]
+        })
+        return out
@@ -1,17 +1,37 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import asyncio
 import jwt
 from bson import ObjectId
+from pymongo import ReturnDocument
 import bcrypt
-from app.database.connection import db
+from app.database.connection import db, reporting_db
+from app.services.analytics_service import (
+    DIMENSIONS, GRANULARITIES, ANALYTICS_TZ, get_rollups, record_status_change
+)
+from app.services.event_bus import event_bus
+from app.services.slot_service import apply_status_change
+from app.middleware.profiling import load_profile
+from app.services.archive_service import (
+    find_with_archive, find_one_with_archive, get_archive_stats, run_archival
+)
+from starlette.concurrency import run_in_threadpool
 import os
 from dotenv import load_dotenv
 
 router = APIRouter()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Comment line sent to idle stream clients so proxies keep the connection open
+STREAM_HEARTBEAT_SECONDS = 15
+# Lifetime of the single-purpose tickets that authenticate /admin/stream in its URL
+STREAM_TICKET_SECONDS = 60
+STREAM_SCOPE = "stream"
 
 # JWT Secret
 SECRET_KEY = os.getenv("JWT_SECRET", "6ebab7e3a4604d8a350a8510f7a806f0")
@@ -34,7 +54,7 @@ def create_initial_admin():
                 "username": os.getenv('ADMIN_USERMANE'),
                 "password": hashed_password,
                 "role": "admin",
-                "createdAt": datetime.now()
+                "createdAt": datetime.now(timezone.utc)
             })
     except Exception as e:
         print(f"Error creating admin user: {e}")
@@ -57,11 +77,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def admin_from_token(token: str, scope: Optional[str] = None):
+    """Return the admin user for a bearer token or raise 401.
+
+    Tokens carry a scope only when issued for one purpose (stream tickets);
+    those are accepted only where that scope is asked for.
+    """
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("scope") != scope:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
@@ -79,6 +104,27 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
             detail="Invalid authentication credentials",
         )
 
+async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return admin_from_token(credentials.credentials)
+
+async def get_stream_admin(
+    ticket: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Like get_current_admin, but also accepts ?ticket= since EventSource cannot send headers.
+
+    Only short-lived stream tickets (POST /admin/stream/ticket) are accepted in
+    the URL, which access logs and proxies record; never the login token.
+    """
+    if credentials:
+        return admin_from_token(credentials.credentials)
+    if ticket:
+        return admin_from_token(ticket, scope=STREAM_SCOPE)
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+    )
+
 @router.post("/login")
 async def login(admin_login: AdminLogin):
     try:
@@ -99,23 +145,29 @@ async def get_all_bookings(
     skip: int = 0, 
     limit: int = 50,
     status_filter: Optional[str] = None,
+    include_archived: bool = False,
+    cursor: Optional[str] = None,
 ):
     query = {}
     if status_filter:
         query["status"] = status_filter
         
-    bookings = list(db.bookings.find(query).sort("createdAt", -1).skip(skip).limit(limit))
-    total = db.bookings.count_documents(query)
-    
+    try:
+        bookings, total, next_cursor = find_with_archive(
+            "bookings", query, skip, limit, include_archived, database=reporting_db, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+        
     for booking in bookings:
         booking["_id"] = str(booking["_id"])
         
-    return {"bookings": bookings, "total": total}
+    return {"bookings": bookings, "total": total, "nextCursor": next_cursor}
 
 @router.get("/bookings/{booking_id}")
 async def get_booking(booking_id: str, current_admin: dict = Depends(get_current_admin)):
     try:
-        booking = db.bookings.find_one({"_id": ObjectId(booking_id)})
+        booking = find_one_with_archive("bookings", {"_id": ObjectId(booking_id)})
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
             
@@ -130,15 +182,30 @@ async def update_booking_status(
     status_update: StatusUpdate,
 ):
     try:
-        result = db.bookings.update_one(
+        previous = db.bookings.find_one_and_update(
             {"_id": ObjectId(booking_id)},
-            {"$set": {"status": status_update.status, "updatedAt": datetime.now()}}
+            {"$set": {"status": status_update.status, "updatedAt": datetime.now(timezone.utc)}},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.modified_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Booking not found")
-            
+        
+        if not apply_status_change(previous, previous.get("status"), status_update.status):
+            # The slot was taken while the booking was cancelled: undo, unless changed again since
+            db.bookings.update_one(
+                {"_id": previous["_id"], "status": status_update.status},
+                {"$set": {"status": previous.get("status")}}
+            )
+            raise HTTPException(status_code=409, detail="The booking's slot is fully booked")
+        
+        record_status_change(previous, previous.get("status"), status_update.status)
+        event_bus.publish_local("booking.status", {
+            "id": booking_id, "status": status_update.status, "previousStatus": previous.get("status")
+        })
         return {"message": "Status updated successfully"}
+    except HTTPException:
+        raise
     except:
         raise HTTPException(status_code=400, detail="Invalid booking ID")
 
@@ -147,19 +214,25 @@ async def get_insurance_requests(
     skip: int = 0, 
     limit: int = 50,
     status_filter: Optional[str] = None,
+    include_archived: bool = False,
+    cursor: Optional[str] = None,
     current_admin: dict = Depends(get_current_admin)
 ):
     query = {"type": "insurance_request"}
     if status_filter:
         query["status"] = status_filter
         
-    requests = list(db.insurance_requests.find(query).sort("createdAt", -1).skip(skip).limit(limit))
-    total = db.insurance_requests.count_documents(query)
+    try:
+        requests, total, next_cursor = find_with_archive(
+            "insurance_requests", query, skip, limit, include_archived, database=reporting_db, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     for req in requests:
         req["_id"] = str(req["_id"])
         
-    return {"requests": requests, "total": total}
+    return {"requests": requests, "total": total, "nextCursor": next_cursor}
 
 @router.put("/insurance-requests/{request_id}/status")
 async def update_insurance_request_status(
@@ -170,12 +243,13 @@ async def update_insurance_request_status(
     try:
         result = db.insurance_requests.update_one(
             {"_id": ObjectId(request_id)},
-            {"$set": {"status": status_update.status, "updatedAt": datetime.now()}}
+            {"$set": {"status": status_update.status, "updatedAt": datetime.now(timezone.utc)}}
         )
         
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Insurance request not found")
-            
+        
+        event_bus.publish_local("insurance_request.status", {"id": request_id, "status": status_update.status})
         return {"message": "Status updated successfully"}
     except:
         raise HTTPException(status_code=400, detail="Invalid insurance request ID")
@@ -184,45 +258,160 @@ async def update_insurance_request_status(
 async def get_car_requests(
     skip: int = 0, 
     limit: int = 50,
+    include_archived: bool = False,
+    cursor: Optional[str] = None,
     current_admin: dict = Depends(get_current_admin)
 ):
     query = {}
         
-    requests = list(db.requests.find(query).sort("createdAt", -1).skip(skip).limit(limit))
-    total = db.requests.count_documents(query)
+    try:
+        requests, total, next_cursor = find_with_archive(
+            "requests", query, skip, limit, include_archived, database=reporting_db, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     for req in requests:
         req["_id"] = str(req["_id"])
         
-    return {"requests": requests, "total": total}
+    return {"requests": requests, "total": total, "nextCursor": next_cursor}
 
 @router.get("/dashboard/stats")
 async def get_dashboard_stats(current_admin: dict = Depends(get_current_admin)):
-    total_bookings = db.bookings.count_documents({})
-    pending_bookings = db.bookings.count_documents({"status": "pending"})
-    completed_bookings = db.bookings.count_documents({"status": "completed"})
+    total_bookings = reporting_db.bookings.count_documents({})
+    pending_bookings = reporting_db.bookings.count_documents({"status": "pending"})
+    completed_bookings = reporting_db.bookings.count_documents({"status": "completed"})
     
     # Calculate revenue (sum of all completed bookings)
     pipeline = [
         {"$match": {"status": "completed"}},
         {"$group": {"_id": None, "totalRevenue": {"$sum": "$totalPrice"}}}
     ]
-    revenue_result = list(db.bookings.aggregate(pipeline))
+    revenue_result = list(reporting_db.bookings.aggregate(pipeline))
     total_revenue = revenue_result[0]["totalRevenue"] if revenue_result else 0
     
     # Insurance requests
-    total_insurance_requests = db.insurance_requests.count_documents({"type": "insurance_request"})
-    pending_insurance_requests = db.insurance_requests.count_documents({"type": "insurance_request", "status": "new"})
+    total_insurance_requests = reporting_db.insurance_requests.count_documents({"type": "insurance_request"})
+    pending_insurance_requests = reporting_db.insurance_requests.count_documents({"type": "insurance_request", "status": "new"})
     
     # Car requests
-    total_car_requests = db.requests.count_documents({})
+    total_car_requests = reporting_db.requests.count_documents({})
+    
+    # Add what has been archived, from the running totals kept by archival
+    archived_bookings = get_archive_stats("bookings", database=reporting_db)
+    archived_insurance = get_archive_stats("insurance_requests", database=reporting_db)
+    archived_requests = get_archive_stats("requests", database=reporting_db)
     
     return {
-        "totalBookings": total_bookings,
-        "pendingBookings": pending_bookings,
-        "completedBookings": completed_bookings,
-        "totalRevenue": total_revenue,
-        "totalInsuranceRequests": total_insurance_requests,
-        "pendingInsuranceRequests": pending_insurance_requests,
-        "totalCarRequests": total_car_requests
-    }
\ No newline at end of file
+        "totalBookings": total_bookings + archived_bookings.get("total", 0),
+        "pendingBookings": pending_bookings + archived_bookings.get("status", {}).get("pending", 0),
+        "completedBookings": completed_bookings + archived_bookings.get("status", {}).get("completed", 0),
+        "totalRevenue": total_revenue + archived_bookings.get("revenue", 0),
+        "totalInsuranceRequests": total_insurance_requests + archived_insurance.get("total", 0),
+        "pendingInsuranceRequests": pending_insurance_requests + archived_insurance.get("status", {}).get("new", 0),
+        "totalCarRequests": total_car_requests + archived_requests.get("total", 0)
+    }
+
+@router.post("/archive/run")
+async def run_archive(
+    older_than_days: Optional[int] = None,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Archive aged, closed records now; normally run from a scheduled job"""
+    if older_than_days is not None and older_than_days < 30:
+        raise HTTPException(status_code=400, detail="older_than_days must be at least 30")
+    try:
+        archived = await run_in_threadpool(run_archival, older_than_days)
+        return {"archived": archived}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/analytics")
+async def get_booking_analytics(
+    granularity: str = Query("day"),
+    dimension: str = Query("all"),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    value: Optional[str] = None,
+    current_admin: dict = Depends(get_current_admin)
+):
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of {', '.join(DIMENSIONS)}")
+    
+    try:
+        today = datetime.now(ANALYTICS_TZ).date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date() if end else today
+        start_date = datetime.strptime(start, "%Y-%m-%d").date() if start else end_date - timedelta(days=30)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start and end must be YYYY-MM-DD dates")
+    
+    if granularity == "week":
+        # Week buckets are keyed by their Monday
+        start_date -= timedelta(days=start_date.weekday())
+    
+    return {
+        "granularity": granularity,
+        "dimension": dimension,
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "rows": get_rollups(granularity, dimension, start_date.isoformat(), end_date.isoformat(), value,
+                            database=reporting_db)
+    }
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("json"),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """A request profile captured with X-Profile: 1; format=folded returns flamegraph input"""
+    profile = load_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return PlainTextResponse(profile["folded"])
+    return profile
+
+@router.post("/stream/ticket")
+async def create_stream_ticket(current_admin: dict = Depends(get_current_admin)):
+    """A ticket for opening /admin/stream?ticket=..., valid for STREAM_TICKET_SECONDS.
+
+    It is checked when the stream connects; fetch a new one to reconnect.
+    """
+    ticket = create_access_token(
+        data={"sub": current_admin["username"], "scope": STREAM_SCOPE},
+        expires_delta=timedelta(seconds=STREAM_TICKET_SECONDS)
+    )
+    return {"ticket": ticket, "expires_in": STREAM_TICKET_SECONDS}
+
+@router.get("/stream")
+async def stream_admin_events(request: Request, current_admin: dict = Depends(get_stream_admin)):
+    """Server-Sent Events feed of new leads and status changes for the CRM dashboard"""
+    subscription = event_bus.subscribe()
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many live dashboard connections")
+    
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    frame = await asyncio.wait_for(subscription.queue.get(), STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                dropped = subscription.take_dropped()
+                if dropped:
+                    # The client fell behind; tell it to refetch instead of trusting the feed
+                    yield f"event: resync\ndata: {{\"dropped\": {dropped}}}\n\n"
+                yield frame
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
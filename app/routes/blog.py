@@ -4,9 +4,26 @@ from datetime import datetime
 from typing import List
 from pydantic import BaseModel
 from app.database.connection import db 
+from app.services.cache import CollectionCache
+from app.services.cache_bus import cache_bus
 
 router = APIRouter()
 
+blog_cache = CollectionCache(["blog_posts"])
+
+def load_blog_posts():
+    posts = list(db.blog_posts.find({}).sort("date", -1))
+    for post in posts:
+        post["id"] = str(post["_id"])
+        post["slug"] = post.get("slug", post["title"].lower().replace(" ", "-"))
+    return posts
+
+def load_blog_post(slug: str):
+    post = db.blog_posts.find_one({"slug": slug})
+    if post:
+        post["id"] = str(post["_id"])
+    return post
+
 class BlogPost(BaseModel):
     title: str
     content: str
@@ -24,22 +41,16 @@ class BlogPostResponse(BlogPost):
 @router.get("/api/blog", response_model=List[BlogPostResponse])
 async def get_blog_posts():
     try:
-        # Use your existing database connection
-        posts = list(db.blog_posts.find({}).sort("date", -1))
-        for post in posts:
-            post["id"] = str(post["_id"])
-            post["slug"] = post.get("slug", post["title"].lower().replace(" ", "-"))
-        return posts
+        return blog_cache.get_or_load("all", load_blog_posts)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/blog/{slug}", response_model=BlogPostResponse)
 async def get_blog_post(slug: str):
     try:
-        post = db.blog_posts.find_one({"slug": slug})
+        post = blog_cache.get_or_load(("slug", slug), lambda: load_blog_post(slug))
         if not post:
             raise HTTPException(status_code=404, detail="Blog post not found")
-        post["id"] = str(post["_id"])
         return post
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -52,6 +63,7 @@ async def create_blog_post(post: BlogPost):
         post_data["slug"] = post_data["title"].lower().replace(" ", "-")
         
         result = db.blog_posts.insert_one(post_data)
+        cache_bus.publish("blog_posts")
         return {"id": str(result.inserted_id), "message": "Blog post created successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
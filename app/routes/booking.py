@@ -1,20 +1,20 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from datetime import datetime
-import pytz
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from datetime import datetime, timezone
 from typing import Dict, List
 from pydantic import BaseModel
 import logging
 from bson import ObjectId
 from app.database.connection import db 
 from app.services.email_service import email_service
+from app.services.analytics_service import record_booking_created
+from app.services.event_bus import event_bus, summarize
+from app.services.quote_service import quote_cart
+from app.services.slot_service import get_availability, reserve_slot, release_slot, validate_slot
 import os
  
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Define IST time zone
-IST_TZ = pytz.timezone('Asia/Kolkata')
-
 class BookingItem(BaseModel):
     packageName: str
     price: float
@@ -42,23 +42,84 @@ class InsuranceClaimRequest(BaseModel):
     year: str
     phone: str
     companyPolicyName: str
-    createdAt: str = datetime.now(IST_TZ).strftime("%Y-%m-%d %H:%M:%S")  
+
+def apply_server_pricing(booking_data: dict):
+    """Replace client-supplied item prices and total with the catalog's"""
+    if not booking_data["cartItems"] or any(item["quantity"] < 1 for item in booking_data["cartItems"]):
+        raise HTTPException(status_code=400, detail="Cart must contain items with a quantity of at least 1")
+    quote = quote_cart(
+        booking_data["brand"],
+        booking_data["model"],
+        booking_data["fuelType"],
+        booking_data["cartItems"]
+    )
+    if quote["unavailable"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Packages not available for this vehicle: {', '.join(quote['unavailable'])}"
+        )
+    
+    if abs(quote["total"] - booking_data["totalPrice"]) > 0.01:
+        logger.warning("Booking total %s differs from quoted total %s",
+                       booking_data["totalPrice"], quote["total"])
+        booking_data["clientTotalPrice"] = booking_data["totalPrice"]
+    booking_data["cartItems"] = [
+        {"packageName": line["packageName"], "price": line["unitPrice"], "quantity": line["quantity"]}
+        for line in quote["items"]
+    ]
+    booking_data["totalPrice"] = quote["total"]
+
+def insert_booking_with_slot(booking_data: dict):
+    """Reserve the booking's slot, then insert it; the slot is released if the insert fails"""
+    booking_data["date"] = booking_data["date"].strip()
+    booking_data["time"] = booking_data["time"].strip()
+    try:
+        config = validate_slot(booking_data["serviceCenter"], booking_data["date"], booking_data["time"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not reserve_slot(booking_data["serviceCenter"], booking_data["date"], booking_data["time"], config):
+        raise HTTPException(status_code=409, detail="Selected slot is fully booked")
+    booking_data["slotHeld"] = True
+    try:
+        result = db.bookings.insert_one(booking_data)
+    except Exception:
+        release_slot(booking_data["serviceCenter"], booking_data["date"], booking_data["time"])
+        raise
+    record_booking_created(booking_data)
+    event_bus.publish_local("booking.created", summarize("bookings", booking_data))
+    return result
+
+@router.get("/availability")
+async def get_slot_availability(serviceCenter: str = Query(...), date: str = Query(...)):
+    try:
+        return {
+            "serviceCenter": serviceCenter,
+            "date": date.strip(),
+            "slots": get_availability(serviceCenter, date.strip())
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting availability: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/submit-booking")
 async def submit_booking(booking: BookingRequest):
     try:
-        logger.info(f"Received booking data: {booking.dict()}")
+        logger.info("Received booking: %s %s at %s on %s %s, %d items",
+                    booking.brand, booking.model, booking.serviceCenter,
+                    booking.date, booking.time, len(booking.cartItems))
         
         if db is None:
             logger.error("Database connection not initialized")
             raise HTTPException(status_code=500, detail="Database connection error")
             
         booking_data = booking.dict()
-        booking_data["createdAt"] = datetime.now(IST_TZ).strftime("%Y-%m-%d %H:%M:%S")  
-       # booking_data["updatedAt"] = datetime.now(IST_TZ).strftime("%Y-%m-%d %H:%M:%S")  
+        apply_server_pricing(booking_data)
+        booking_data["createdAt"] = datetime.now(timezone.utc)
         
-        # Insert the booking into MongoDB
-        result = db.bookings.insert_one(booking_data)
+        # Reserve the slot and insert the booking into MongoDB
+        result = insert_booking_with_slot(booking_data)
         
         return {
             "success": True,
@@ -66,6 +127,8 @@ async def submit_booking(booking: BookingRequest):
             "message": "Booking submitted successfully"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting booking: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,7 +155,8 @@ async def get_bookings(phone: str = None):
 @router.post("/submit-insurance-request")
 async def submit_insurance_request(request: InsuranceClaimRequest):
     try:
-        logger.info(f"Received insurance request: {request.dict()}")
+        logger.info("Received insurance request: %s %s (%s)",
+                    request.brand, request.model, request.companyPolicyName)
         
         if db is None:
             logger.error("Database connection not initialized")
@@ -101,10 +165,11 @@ async def submit_insurance_request(request: InsuranceClaimRequest):
         request_data = request.dict()
         request_data["type"] = "insurance_request"
         request_data["status"] = "new"
-        request_data["createdAt"] = datetime.now(IST_TZ).strftime("%Y-%m-%d %H:%M:%S")  
+        request_data["createdAt"] = datetime.now(timezone.utc)
         
         # Insert into a separate collection
         result = db.insurance_requests.insert_one(request_data)
+        event_bus.publish_local("insurance_request.created", summarize("insurance_requests", request_data))
         
         return {
             "success": True,
@@ -119,17 +184,20 @@ async def submit_insurance_request(request: InsuranceClaimRequest):
 @router.post("/submit-booking")
 async def submit_booking(booking: BookingRequest, background_tasks: BackgroundTasks):
     try:
-        logger.info(f"Received booking data: {booking.dict()}")
+        logger.info("Received booking: %s %s at %s on %s %s, %d items",
+                    booking.brand, booking.model, booking.serviceCenter,
+                    booking.date, booking.time, len(booking.cartItems))
         
         if db is None:
             logger.error("Database connection not initialized")
             raise HTTPException(status_code=500, detail="Database connection error")
             
         booking_data = booking.dict()
-        booking_data["createdAt"] = datetime.now(IST_TZ).strftime("%Y-%m-%d %H:%M:%S")
+        apply_server_pricing(booking_data)
+        booking_data["createdAt"] = datetime.now(timezone.utc)
         
-        # Insert the booking into MongoDB
-        result = db.bookings.insert_one(booking_data)
+        # Reserve the slot and insert the booking into MongoDB
+        result = insert_booking_with_slot(booking_data)
         
         # Send email notification in background
         admin_emails = os.getenv("ADMIN_EMAILS", "").split(",")
@@ -146,6 +214,8 @@ async def submit_booking(booking: BookingRequest, background_tasks: BackgroundTa
             "message": "Booking submitted successfully"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting booking: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))    
\ No newline at end of file
@@ -1,22 +1,29 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from app.database.connection import db
 from app.models.car import CarBrand, CarRequest
+from app.models.records import CarBrandRecord, dumps
 from app.config import settings
+from app.services.cache import SingleFlightCache
+from app.services.cache_bus import cache_bus
+from app.services.event_bus import event_bus, summarize
+from app.services.media_service import media_url, versioned_url
 from typing import List
 import os
 import shutil
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 import logging
 import re
-import pytz
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Define IST time zone
-IST_TZ = pytz.timezone('Asia/Kolkata')
+brands_cache = SingleFlightCache(
+    ["brands"],
+    ttl=settings.CATALOG_CACHE_TTL,
+    stale_ttl=settings.CATALOG_CACHE_STALE_TTL
+)
 
 def normalize_name(name: str) -> str:
     """Convert to lowercase and replace spaces with underscores"""
@@ -41,7 +48,7 @@ def save_uploaded_file(file: UploadFile, category: str, name: str) -> dict:
         
         return {
             "filename": filename,
-            "url": f"{settings.MEDIA_URL}{category}/{filename}"
+            "url": media_url(f"{category}/{filename}")
         }
     except Exception as e:
         logger.error(f"Error saving file: {str(e)}")
@@ -62,6 +69,7 @@ async def upload_brand_logo(brand: str, file: UploadFile = File(...)):
         }},
         upsert=True
     )
+    cache_bus.publish("brands")
     
     return result
 
@@ -86,6 +94,7 @@ async def upload_model_image(brand: str, model: str, file: UploadFile = File(...
         }}},
         upsert=True
     )
+    cache_bus.publish("brands")
     
     return result
 
@@ -99,6 +108,7 @@ async def add_fuel_type(brand: str, model: str, fuel_type: str):
         {"$addToSet": {"models.$.fuel_types": normalized_fuel}},
         upsert=True
     )
+    cache_bus.publish("brands")
     
     return {"message": f"Fuel type {normalized_fuel} added to {brand} {model}"}
 
@@ -116,7 +126,7 @@ async def get_brand_logos():
                     brand_name = filename.split("_")[0].capitalize()
                     logos.append({
                         "brand": brand_name,
-                        "url": f"{settings.MEDIA_URL}brands/{filename}"
+                        "url": media_url(f"brands/{filename}")
                     })
         
         return logos
@@ -137,7 +147,7 @@ async def get_model_images(brand: str):
                     model_name = " ".join(part.capitalize() for part in parts[1:-1])
                     images.append({
                         "model": model_name,
-                        "url": f"{settings.MEDIA_URL}models/{filename}"
+                        "url": media_url(f"models/{filename}")
                     })
         
         return images
@@ -157,7 +167,7 @@ async def get_fuel_icons():
                     fuel_type = filename.split(".")[0].capitalize()
                     icons.append({
                         "type": fuel_type,
-                        "url": f"{settings.MEDIA_URL}fuels/{filename}"
+                        "url": media_url(f"fuels/{filename}")
                     })
         
         return icons
@@ -165,11 +175,21 @@ async def get_fuel_icons():
         logger.error(f"Error getting fuel icons: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def load_all_brands() -> bytes:
+    """The /car/all-brands body, rendered once per cache load"""
+    brands = [CarBrandRecord.from_doc(doc) for doc in db.brands.find({}, CarBrandRecord.PROJECTION)]
+    # Fingerprint logo and model image URLs once per load, not per request
+    for brand in brands:
+        brand.logoUrl = versioned_url(brand.logoUrl)
+        for model in brand.models:
+            model.imageUrl = versioned_url(model.imageUrl)
+    return dumps([brand.to_dict() for brand in brands])
+
 @router.get("/all-brands", response_model=List[CarBrand])
 async def get_all_brands():
     try:
-        brands = list(db.brands.find({}))
-        return brands
+        body = await brands_cache.get("all", load_all_brands)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting all brands: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -185,14 +205,14 @@ async def submit_request(request: CarRequest, response: Response):
             "fuelType": request.fuelType,
             "year": request.year,
             "phone": request.phone,
-            "createdAt": datetime.now(IST_TZ).strftime("%Y-%m-%d %H:%M:%S")  
-
+            "createdAt": datetime.now(timezone.utc)
         }
         response.headers["Access-Control-Allow-Origin"] = "*"
         response.headers["Access-Control-Allow-Methods"] = "POST"
         response.headers["Access-Control-Allow-Headers"] = "Content-Type"
         
         result = db.requests.insert_one(request_data)
+        event_bus.publish_local("car_request.created", summarize("requests", request_data))
         return {
             "message": "Request submitted successfully",
             "id": str(result.inserted_id)
@@ -1,17 +1,30 @@
 from fastapi import APIRouter, HTTPException, Query, Body
 from app.database.connection import db
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from fastapi.encoders import jsonable_encoder
 from bson import ObjectId
 import logging
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from urllib.parse import unquote
+from app.config.logging_config import log_sampled
+from app.config import settings
+from app.services.cache import CollectionCache, SingleFlightCache
+from app.services.cache_bus import cache_bus
+from app.services.quote_service import quote_cart
+from app.services.pricing_service import find_prices, find_embedded_price, sync_or_fall_back
+from app.models.records import ServicePackageRecord
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+packages_cache = SingleFlightCache(
+    ["service_packages", "package_prices"],
+    ttl=settings.CATALOG_CACHE_TTL,
+    stale_ttl=settings.CATALOG_CACHE_STALE_TTL
+)
+# Package records per category, shared by every vehicle's lookup
+category_cache = CollectionCache(["service_packages"])
 
 class ServicePackage(BaseModel):
     name: str
@@ -25,6 +38,73 @@ class ServicePackage(BaseModel):
     Extra: Optional[str] = None  
     Extra1: Optional[str] = None 
 
+MAX_QUOTE_ITEMS = 200
+
+class QuoteItem(BaseModel):
+    packageName: str
+    quantity: int = Field(1, ge=1, le=100)
+
+class QuoteRequest(BaseModel):
+    brand: str
+    model: str
+    fuelType: str
+    items: List[QuoteItem]
+
+def load_service_packages(decoded_category: str, fuel_type: str, brand: str, model: str) -> tuple:
+    """Build the get_service_packages response once: (status code, rendered JSON body)"""
+    status_code, content = _find_service_packages(decoded_category, fuel_type, brand, model)
+    response = JSONResponse(status_code=status_code, content=jsonable_encoder(content))
+    return response.status_code, response.body
+
+def load_category_packages(decoded_category: str):
+    # Build query with case-insensitive matching
+    query = {"category": {"$regex": f"^{decoded_category}$", "$options": "i"}}
+    logger.debug("Executing query: %s", query)
+    packages = tuple(ServicePackageRecord.from_doc(pkg) for pkg in db.service_packages.find(query))
+    logger.debug("Found %d packages matching category", len(packages))
+    return packages or None
+
+def _find_service_packages(decoded_category: str, fuel_type: str, brand: str, model: str) -> tuple:
+    packages = category_cache.get_or_load(decoded_category, lambda: load_category_packages(decoded_category))
+    
+    if not packages:
+        logger.warning("No packages found for category: %s", decoded_category)
+        return 404, {"message": f"No packages found for category: {decoded_category}"}
+    
+    # Migrated packages are priced from package_prices in a single indexed query;
+    # the rest still fall back to the embedded pricing tree
+    migrated_ids = [pkg.id for pkg in packages if pkg.get("pricingMigrated")]
+    prices = find_prices(migrated_ids, brand, model, fuel_type)
+        
+    # Transform packages to include only those with pricing for the specified brand and model
+    transformed_packages = []
+    for pkg in packages:
+        try:
+            if pkg.get("pricingMigrated"):
+                fuel_data = prices.get(pkg.id)
+            else:
+                fuel_data = find_embedded_price(pkg, brand, model, fuel_type)
+            
+            if not fuel_data:
+                log_sampled(logger, logging.DEBUG, "No pricing for %s %s (%s) in package: %s",
+                            brand, model, fuel_type, pkg.name)
+                continue
+            
+            transformed_packages.append(pkg.to_priced_dict(fuel_data))
+            log_sampled(logger, logging.DEBUG, "Included package: %s for %s %s (%s)",
+                        pkg.name, brand, model, fuel_type)
+        except (KeyError, TypeError, AttributeError) as e:
+            logger.debug("Error processing package %s: %s", pkg.get("name", "unknown"), e)
+            continue
+        
+    if not transformed_packages:
+        logger.warning("No packages found for %s %s (%s) in category: %s",
+                       brand, model, fuel_type, decoded_category)
+        return 404, {"message": f"No packages found for {brand} {model} ({fuel_type}) in category: {decoded_category}"}
+        
+    logger.debug("Returning %d packages", len(transformed_packages))
+    return 200, transformed_packages
+
 @router.get("/service-packages")
 async def get_service_packages(
     category: str = Query(...),
@@ -35,12 +115,13 @@ async def get_service_packages(
     try:
         # Decode the URL-encoded category
         decoded_category = unquote(category)
-        logger.info(f"Received request: category={decoded_category}, fuel_type={fuel_type}, brand={brand}, model={model}")
+        logger.debug("Received request: category=%s, fuel_type=%s, brand=%s, model=%s",
+                     decoded_category, fuel_type, brand, model)
         
         # Validate inputs
         valid_fuels = ["Petrol", "Diesel", "CNG", "Electric", "Hybrid"]
         if fuel_type not in valid_fuels:
-            logger.warning(f"Invalid fuel type: {fuel_type}")
+            logger.warning("Invalid fuel type: %s", fuel_type)
             return JSONResponse(
                 status_code=400,
                 content={"message": f"Invalid fuel type. Must be one of {', '.join(valid_fuels)}"}
@@ -53,76 +134,15 @@ async def get_service_packages(
                 content={"message": "Brand and model are required"}
             )
             
-        # Build query with case-insensitive matching
-        query = {"category": {"$regex": f"^{decoded_category}$", "$options": "i"}}
-        logger.info(f"Executing query: {query}")
-        
-        # Fetch packages
-        packages = list(db.service_packages.find(query, {"_id": 0}))
-        logger.info(f"Found {len(packages)} packages matching category")
-        
-        if not packages:
-            logger.warning(f"No packages found for category: {decoded_category}")
-            return JSONResponse(
-                status_code=404,
-                content={"message": f"No packages found for category: {decoded_category}"}
-            )
-            
-        # Transform packages to include only those with pricing for the specified brand and model
-        transformed_packages = []
-        for pkg in packages:
-            try:
-                # Case-insensitive lookup for brand and model
-                brand_lower = brand.lower()
-                model_lower = model.lower()
-                
-                brands = pkg.get("pricing", {}).get("brands", {})
-                brand_data = next((v for k, v in brands.items() if k.lower() == brand_lower), None)
-                
-                if not brand_data:
-                    logger.debug(f"Brand {brand} not found in package: {pkg['name']}")
-                    continue
-                
-                models = brand_data.get("models", {})
-                model_data = next((v for k, v in models.items() if k.lower() == model_lower), None)
-                
-                if not model_data:
-                    logger.debug(f"Model {model} not found in package: {pkg['name']}")
-                    continue
-                
-                fuel_data = model_data.get("fuelTypes", {}).get(fuel_type)
-                if not fuel_data:
-                    logger.debug(f"Fuel type {fuel_type} not found in package: {pkg['name']}")
-                    continue
-                
-                price = fuel_data.get("basePrice", 0)
-                discounted_price = fuel_data.get("discountedPrice", price)
-                
-                transformed = {
-                    **pkg,
-                    "price": price,
-                    "discountedPrice": discounted_price,
-                    "Extra": fuel_data.get("Extra", ""),
-                    "Extra1": fuel_data.get("Extra1", "") 
-                }
-                transformed_packages.append(transformed)
-                logger.info(f"Included package: {pkg['name']} for {brand} {model} ({fuel_type})")
-            except (KeyError, TypeError) as e:
-                logger.debug(f"Error processing package {pkg.get('name', 'unknown')}: {str(e)}")
-                continue
-            
-        if not transformed_packages:
-            logger.warning(f"No packages found for {brand} {model} ({fuel_type}) in category: {decoded_category}")
-            return JSONResponse(
-                status_code=404,
-                content={"message": f"No packages found for {brand} {model} ({fuel_type}) in category: {decoded_category}"}
-            )
-            
-        logger.info(f"Returning {len(transformed_packages)} packages")
-        return transformed_packages
+        # Identical concurrent lookups share one query; results are cached briefly
+        status_code, body = await packages_cache.get(
+            (decoded_category, fuel_type, brand, model),
+            lambda: load_service_packages(decoded_category, fuel_type, brand, model)
+        )
+        return Response(content=body, status_code=status_code, media_type="application/json")
         
     except Exception as e:
-        logger.error(f"Error getting packages: {str(e)}")
+        logger.error("Error getting packages: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/service-packages")
@@ -140,6 +160,8 @@ async def create_service_package(package: ServicePackage):
             )
         
         result = db.service_packages.insert_one(package_data)
+        sync_or_fall_back(result.inserted_id, package_data["pricing"])
+        cache_bus.publish("service_packages")
         logger.info(f"Created package: {package_data['name']} with ID: {result.inserted_id}")
         return {"id": str(result.inserted_id), "message": "Package created successfully"}
     except Exception as e:
@@ -160,15 +182,35 @@ async def update_service_package(package_name: str, package: ServicePackage):
                 detail="Pricing must include at least one brand with models and fuel types"
             )
         
-        result = db.service_packages.update_one(
+        # Resolve the _id in the same operation: the update may rename the package.
+        # Until the sync below succeeds, the package is priced from its new embedded tree.
+        updated = db.service_packages.find_one_and_update(
             {"name": package_name},
-            {"$set": package_data}
+            {"$set": {**package_data, "pricingMigrated": False}},
+            projection={"_id": 1}
         )
-        if result.modified_count == 0:
+        if updated is None:
             logger.warning(f"Package not found: {package_name}")
             raise HTTPException(status_code=404, detail="Package not found")
+        sync_or_fall_back(updated["_id"], package_data["pricing"])
+        cache_bus.publish("service_packages")
         logger.info(f"Updated package: {package_name}")
         return {"message": "Package updated successfully"}
     except Exception as e:
         logger.error(f"Error updating package: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/quote")
+async def get_quote(request: QuoteRequest):
+    if not request.items or len(request.items) > MAX_QUOTE_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A quote needs between 1 and {MAX_QUOTE_ITEMS} items")
+    try:
+        return quote_cart(
+            request.brand,
+            request.model,
+            request.fuelType,
+            [item.dict() for item in request.items]
+        )
+    except Exception as e:
+        logger.error("Error building quote: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""Pre-aggregated booking rollups.
+
+Every booking write adds its increments to ``booking_rollups`` documents,
+one per (granularity, period, dimension, value), e.g.
+``day|2024-05-01|brand|BMW``. Admin analytics read these documents only,
+never the bookings collection.
+
+Counters per document: ``bookings``, ``bookedValue`` (sum of totalPrice at
+submission), ``completed`` and ``revenue`` (bookings currently in the
+completed state), ``status.<name>`` (bookings currently in each status)
+and, for the package dimension, ``quantity``.
+"""
+from datetime import datetime, timedelta, timezone
+import logging
+import pytz
+from pymongo import UpdateOne
+from app.config import settings
+from app.database.connection import db
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_TZ = pytz.timezone(settings.ANALYTICS_TZ)
+LEGACY_TZ = pytz.timezone("Asia/Kolkata")
+LEGACY_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+GRANULARITIES = ("day", "week")
+DIMENSIONS = ("all", "brand", "serviceCenter", "package")
+
+def as_utc(value):
+    """Timestamps as aware UTC datetimes; legacy values are IST strings"""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    if isinstance(value, str):
+        return LEGACY_TZ.localize(datetime.strptime(value.strip(), LEGACY_FORMAT)).astimezone(timezone.utc)
+    return None
+
+def _periods(created_at) -> list:
+    local_day = as_utc(created_at).astimezone(ANALYTICS_TZ).date()
+    week_start = local_day - timedelta(days=local_day.weekday())
+    return [("day", local_day.isoformat()), ("week", week_start.isoformat())]
+
+def _status_field(status) -> str:
+    return "status." + str(status or "unknown").replace(".", "_").replace("$", "_")
+
+def _line_total(item) -> float:
+    return (item.get("price") or 0) * (item.get("quantity") or 0)
+
+def booking_created_deltas(booking: dict) -> list:
+    """(dimension, value, increments) for a newly submitted booking"""
+    total = booking.get("totalPrice") or 0
+    counters = {"bookings": 1, "bookedValue": total, _status_field(booking.get("status")): 1}
+    deltas = [
+        ("all", "all", counters),
+        ("brand", booking.get("brand"), counters),
+        ("serviceCenter", booking.get("serviceCenter"), counters),
+    ]
+    for item in booking.get("cartItems", []):
+        deltas.append(("package", item.get("packageName"), {
+            "bookings": 1,
+            "quantity": item.get("quantity") or 0,
+            "bookedValue": _line_total(item)
+        }))
+    deltas.extend(status_change_deltas(booking, None, booking.get("status"), counted=True))
+    return deltas
+
+def status_change_deltas(booking: dict, old_status, new_status, counted: bool = False) -> list:
+    """Increments for a status transition. ``counted`` skips the status counters
+    (used by booking_created_deltas, which already counted the initial status)."""
+    if old_status == new_status:
+        return []
+    counters = {}
+    if not counted:
+        counters[_status_field(old_status)] = -1
+        counters[_status_field(new_status)] = 1
+
+    sign = 0
+    if new_status == "completed":
+        sign = 1
+    elif old_status == "completed":
+        sign = -1
+
+    deltas = []
+    if sign:
+        counters = {**counters, "completed": sign, "revenue": sign * (booking.get("totalPrice") or 0)}
+    if counters:
+        deltas = [
+            ("all", "all", counters),
+            ("brand", booking.get("brand"), counters),
+            ("serviceCenter", booking.get("serviceCenter"), counters),
+        ]
+    if sign:
+        for item in booking.get("cartItems", []):
+            deltas.append(("package", item.get("packageName"), {
+                "completed": sign,
+                "revenue": sign * _line_total(item)
+            }))
+    return deltas
+
+def accumulate(acc: dict, created_at, deltas: list):
+    """Merge deltas for one booking into ``acc`` (rollup _id -> increments)"""
+    for granularity, period in _periods(created_at):
+        for dimension, value, counters in deltas:
+            if value is None:
+                continue
+            rollup_id = f"{granularity}|{period}|{dimension}|{value}"
+            entry = acc.setdefault(rollup_id, {
+                "key": {"granularity": granularity, "period": period, "dimension": dimension, "value": value},
+                "inc": {}
+            })
+            for field, amount in counters.items():
+                entry["inc"][field] = entry["inc"].get(field, 0) + amount
+    return acc
+
+def flush(acc: dict, collection=None):
+    if not acc:
+        return
+    collection = db.booking_rollups if collection is None else collection
+    collection.bulk_write([
+        UpdateOne(
+            {"_id": rollup_id},
+            {"$inc": entry["inc"], "$setOnInsert": entry["key"]},
+            upsert=True
+        )
+        for rollup_id, entry in acc.items()
+    ], ordered=False)
+
+def record_booking_created(booking: dict):
+    try:
+        flush(accumulate({}, booking["createdAt"], booking_created_deltas(booking)))
+    except Exception as e:
+        logger.error("Failed to update booking rollups: %s", e, exc_info=True)
+
+def record_status_change(booking: dict, old_status, new_status):
+    try:
+        deltas = status_change_deltas(booking, old_status, new_status)
+        if deltas:
+            flush(accumulate({}, booking["createdAt"], deltas))
+    except Exception as e:
+        logger.error("Failed to update booking rollups: %s", e, exc_info=True)
+
+def get_rollups(granularity: str, dimension: str, start: str, end: str, value: str = None, database=None) -> list:
+    query = {
+        "granularity": granularity,
+        "dimension": dimension,
+        "period": {"$gte": start, "$lte": end}
+    }
+    if value:
+        query["value"] = value
+    database = db if database is None else database
+    rows = list(database.booking_rollups.find(query, {"_id": 0, "granularity": 0, "dimension": 0}).sort("period", 1))
+    for row in rows:
+        row["status"] = row.get("status", {})
+    return rows
@@ -0,0 +1,170 @@
+"""Move aged, closed records out of the hot collections.
+
+Records older than ARCHIVE_AFTER_DAYS whose status is in ARCHIVE_STATUSES
+are moved in batches either to ``<collection>_archive`` or to gzipped
+NDJSON files under ARCHIVE_DIR. Each batch is copied before it is deleted,
+and copies are idempotent, so an interrupted run is safe to repeat.
+
+Per-collection totals of what has been archived are kept in
+``archive_stats`` so dashboard counts stay whole without reading the
+archive.
+
+    python -m app.services.archive_service [--days 180] [--mode collection|ndjson]
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import gzip
+import heapq
+import logging
+import os
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.database.connection import db
+from app.services.analytics_service import as_utc
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLLECTIONS = ["bookings", "insurance_requests", "requests"]
+
+def archive_name(name: str) -> str:
+    return f"{name}_archive"
+
+def _copy_to_collection(name: str, batch: list):
+    try:
+        db[archive_name(name)].insert_many(batch, ordered=False)
+    except BulkWriteError as e:
+        # Already copied by an earlier, interrupted run
+        if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+
+def _copy_to_file(name: str, batch: list):
+    directory = settings.ARCHIVE_DIR / name
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}-{batch[0]['_id']}-{batch[-1]['_id']}.ndjson.gz"
+    tmp_path = path.with_suffix(".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        for doc in batch:
+            f.write(json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS))
+            f.write("\n")
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _stats_increments(batch: list) -> dict:
+    inc = {"total": len(batch)}
+    for doc in batch:
+        status = "status." + str(doc.get("status") or "unknown").replace(".", "_").replace("$", "_")
+        inc[status] = inc.get(status, 0) + 1
+        if doc.get("status") == "completed":
+            inc["revenue"] = inc.get("revenue", 0) + (doc.get("totalPrice") or 0)
+    return inc
+
+def archive_collection(name: str, older_than_days: int = None, mode: str = None, batch_size: int = None) -> int:
+    older_than_days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    mode = mode or settings.ARCHIVE_MODE
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+
+    query = {"createdAt": {"$lt": datetime.now(timezone.utc) - timedelta(days=older_than_days)}}
+    statuses = settings.ARCHIVE_STATUSES.get(name)
+    if statuses:
+        query["status"] = {"$in": statuses}
+
+    moved = 0
+    while True:
+        batch = list(db[name].find(query).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+        if mode == "ndjson":
+            _copy_to_file(name, batch)
+        else:
+            _copy_to_collection(name, batch)
+        db[name].delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+        db.archive_stats.update_one(
+            {"_id": name},
+            {"$inc": _stats_increments(batch), "$set": {"updatedAt": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        moved += len(batch)
+        logger.info("Archived %d %s so far", moved, name)
+    return moved
+
+def run_archival(older_than_days: int = None, mode: str = None) -> dict:
+    return {name: archive_collection(name, older_than_days, mode) for name in ARCHIVED_COLLECTIONS}
+
+def get_archive_stats(name: str, database=None) -> dict:
+    database = db if database is None else database
+    return database.archive_stats.find_one({"_id": name}) or {}
+
+_EPOCH_MIN = datetime.min.replace(tzinfo=timezone.utc)
+NEWEST_FIRST = [("createdAt", -1), ("_id", -1)]
+
+def _sort_key(doc):
+    try:
+        created = as_utc(doc.get("createdAt")) or _EPOCH_MIN
+    except ValueError:
+        created = _EPOCH_MIN
+    return created, doc["_id"]
+
+def encode_cursor(doc) -> str:
+    """Keyset cursor pointing just past ``doc`` in newest-first order"""
+    created, _id = _sort_key(doc)
+    return f"{created.isoformat()}|{_id}"
+
+def _after_cursor(query: dict, cursor: str) -> dict:
+    try:
+        created, _, raw_id = cursor.partition("|")
+        created, doc_id = datetime.fromisoformat(created), ObjectId(raw_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return {"$and": [query, {"$or": [
+        {"createdAt": {"$lt": created}},
+        {"createdAt": created, "_id": {"$lt": doc_id}}
+    ]}]}
+
+def find_with_archive(name: str, query: dict, skip: int, limit: int, include_archived: bool = False,
+                      database=None, cursor: str = None) -> tuple:
+    """A newest-first page of ``name``, its total and the cursor of the next page.
+
+    With ``include_archived`` the archive collection is merged in. That is
+    paged by keyset (pass back the returned cursor), so each page reads at
+    most ``limit`` documents from each side; ``skip`` is only supported
+    without it. Archived records are marked with ``archived: True``. NDJSON
+    archives are offline.
+    """
+    database = db if database is None else database
+    hot = database[name]
+    if include_archived and skip:
+        raise ValueError("Page archived listings with cursor, not skip")
+    page_query = _after_cursor(query, cursor) if cursor else query
+
+    if not include_archived:
+        docs = list(hot.find(page_query).sort(NEWEST_FIRST).skip(skip).limit(limit))
+        total = hot.count_documents(query)
+    else:
+        cold = database[archive_name(name)]
+        recent = list(hot.find(page_query).sort(NEWEST_FIRST).limit(limit))
+        archived = list(cold.find(page_query).sort(NEWEST_FIRST).limit(limit))
+        for doc in archived:
+            doc["archived"] = True
+        docs = list(heapq.merge(recent, archived, key=_sort_key, reverse=True))[:limit]
+        total = hot.count_documents(query) + cold.count_documents(query)
+    next_cursor = encode_cursor(docs[-1]) if docs and len(docs) == limit else None
+    return docs, total, next_cursor
+
+def find_one_with_archive(name: str, query: dict):
+    doc = db[name].find_one(query)
+    if doc is None:
+        doc = db[archive_name(name)].find_one(query)
+        if doc is not None:
+            doc["archived"] = True
+    return doc
+
+if __name__ == "__main__":
+    from app.config.logging_config import setup_logging
+    setup_logging(fmt="text")
+    parser = argparse.ArgumentParser(description="Archive aged, closed leads and bookings")
+    parser.add_argument("--days", type=int, default=None)
+    parser.add_argument("--mode", choices=["collection", "ndjson"], default=None)
+    args = parser.parse_args()
+    logger.info("Archival finished: %s", run_archival(args.days, args.mode))
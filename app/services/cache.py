@@ -0,0 +1,124 @@
+from collections import OrderedDict
+import asyncio
+import threading
+import time
+from starlette.concurrency import run_in_threadpool
+from app.services.cache_bus import cache_bus
+
+class CollectionCache:
+    """In-process cache of values derived from some collections.
+
+    Cleared by the invalidation bus whenever one of those collections
+    changes in any worker.
+    """
+
+    def __init__(self, collections: list):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        cache_bus.subscribe(collections, self.clear)
+
+    def clear(self, collection: str = None):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, computing it with ``loader()`` on a miss.
+
+        A ``None`` result is returned but not cached.
+        """
+        with self._lock:
+            if key in self._data:
+                return self._data[key]
+            generation = self._generation
+
+        value = loader()
+        with self._lock:
+            # Don't keep a value read before an invalidation that raced with it
+            if value is not None and generation == self._generation:
+                self._data[key] = value
+        return value
+
+class SingleFlightCache:
+    """Async read-through cache for hot catalog queries.
+
+    - concurrent misses for the same key share one load (single flight)
+    - values are fresh for ``ttl`` seconds; until ``stale_ttl`` they are
+      still served while a single background refresh runs
+    - the invalidation bus clears everything, including loads in flight
+
+    ``loader`` is a blocking function; it runs in the threadpool.
+    """
+
+    def __init__(self, collections: list, ttl: float, stale_ttl: float, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        cache_bus.subscribe(collections, self.clear)
+
+    def clear(self, collection: str = None):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._inflight.clear()
+
+    async def get(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            future = self._inflight.get(key)
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                return value
+            if now < stale_until:
+                if future is None:
+                    self._load(key, loader)
+                return value
+        if future is None:
+            future = self._load(key, loader)
+        # Shielded so one cancelled request doesn't cancel the load for the others
+        return await asyncio.shield(future)
+
+    def _load(self, key, loader):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(_consume_exception)
+        with self._lock:
+            self._inflight[key] = future
+            generation = self._generation
+
+        async def run():
+            try:
+                value = await run_in_threadpool(loader)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                now = time.monotonic()
+                with self._lock:
+                    if generation == self._generation:
+                        self._entries[key] = (value, now + self.ttl, now + self.stale_ttl)
+                        self._entries.move_to_end(key)
+                        while len(self._entries) > self.max_entries:
+                            self._entries.popitem(last=False)
+                future.set_result(value)
+            finally:
+                with self._lock:
+                    if self._inflight.get(key) is future:
+                        del self._inflight[key]
+
+        loop.create_task(run())
+        return future
+
+def _consume_exception(future):
+    # Background refreshes may fail with nobody awaiting them
+    if not future.cancelled():
+        future.exception()
@@ -0,0 +1,117 @@
+"""Cache invalidation shared by every worker and instance.
+
+Writers call ``cache_bus.publish(collection)``: local caches are cleared
+right away and a per-collection version document is bumped. Other workers
+hear about it either from a MongoDB change stream on the catalog
+collections (replica sets / Atlas) or, without a replica set, by polling
+the version documents every CACHE_POLL_INTERVAL seconds.
+"""
+from datetime import datetime, timezone
+import logging
+import threading
+from app.config import settings
+from app.database.connection import db
+
+logger = logging.getLogger(__name__)
+
+CATALOG_COLLECTIONS = ["brands", "service_packages", "package_prices", "blog_posts"]
+
+class CacheInvalidationBus:
+    def __init__(self, collections: list):
+        self.collections = list(collections)
+        self._subscribers = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.mode = None
+
+    def subscribe(self, collections: list, callback):
+        """Call ``callback(collection)`` whenever one of ``collections`` changes"""
+        for name in collections:
+            self._subscribers.setdefault(name, []).append(callback)
+
+    def notify_local(self, collection: str):
+        for callback in self._subscribers.get(collection, []):
+            try:
+                callback(collection)
+            except Exception as e:
+                logger.error("Cache invalidation callback failed for %s: %s", collection, e)
+
+    def publish(self, collection: str):
+        """Invalidate ``collection`` in this worker and announce it to the others"""
+        self.notify_local(collection)
+        try:
+            db.cache_versions.update_one(
+                {"_id": collection},
+                {"$inc": {"version": 1}, "$set": {"updatedAt": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error("Failed to bump cache version for %s: %s", collection, e)
+
+    def _supports_change_streams(self) -> bool:
+        try:
+            hello = db.client.admin.command("hello")
+            return bool(hello.get("setName") or hello.get("msg") == "isdbgrid")
+        except Exception:
+            return False
+
+    def start(self):
+        if self._thread is not None:
+            return
+        mode = settings.CACHE_BUS_MODE
+        if mode == "off":
+            return
+        if mode == "auto":
+            mode = "changestream" if self._supports_change_streams() else "poll"
+        self.mode = mode
+        target = self._watch if mode == "changestream" else self._poll
+        self._stop.clear()
+        self._thread = threading.Thread(target=target, name=f"cache-bus-{mode}", daemon=True)
+        self._thread.start()
+        logger.info("Cache invalidation bus started in %s mode", mode)
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _invalidate_all(self):
+        for name in self.collections:
+            self.notify_local(name)
+
+    def _watch(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": self.collections}}}]
+        resume_token = None
+        while not self._stop.is_set():
+            try:
+                with db.watch(pipeline, resume_after=resume_token, max_await_time_ms=1000) as stream:
+                    while not self._stop.is_set():
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+                        resume_token = stream.resume_token
+                        self.notify_local(change["ns"]["coll"])
+            except Exception as e:
+                # Changes may have been missed while the stream was down
+                logger.error("Cache change stream failed, restarting: %s", e)
+                resume_token = None
+                self._invalidate_all()
+                self._stop.wait(1)
+
+    def _poll(self):
+        seen = None
+        while not self._stop.is_set():
+            try:
+                versions = {
+                    doc["_id"]: doc.get("version", 0)
+                    for doc in db.cache_versions.find({"_id": {"$in": self.collections}})
+                }
+                if seen is not None:
+                    for name, version in versions.items():
+                        if seen.get(name) != version:
+                            self.notify_local(name)
+                seen = versions
+            except Exception as e:
+                logger.error("Cache version poll failed: %s", e)
+            self._stop.wait(settings.CACHE_POLL_INTERVAL)
+
+cache_bus = CacheInvalidationBus(CATALOG_COLLECTIONS)
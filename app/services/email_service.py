@@ -3,19 +3,24 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 import logging
+import pytz
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+IST_TZ = pytz.timezone('Asia/Kolkata')
+
 class EmailService:
     def __init__(self):
         self.smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", 587))
         self.sender_email = os.getenv("SMTP_EMAIL")
         self.sender_password = os.getenv("SMTP_PASSWORD")
+        self.use_starttls = os.getenv("SMTP_STARTTLS", "true").lower() != "false"
         
     async def send_booking_notification(self, booking_data, admin_emails):
         try:
@@ -25,6 +30,10 @@ class EmailService:
             msg['To'] = ", ".join(admin_emails)
             msg['Subject'] = f"New Booking: {booking_data['brand']} {booking_data['model']}"
             
+            created_at = booking_data.get('createdAt', 'N/A')
+            if isinstance(created_at, datetime):
+                created_at = created_at.astimezone(IST_TZ).strftime("%Y-%m-%d %H:%M:%S IST")
+
             # Create email body
             body = f"""
             New Booking Received:
@@ -49,15 +58,17 @@ class EmailService:
             Services Requested:
             {chr(10).join([f"  • {item['packageName']} (Qty: {item['quantity']}, ₹{item['price']})" for item in booking_data.get('cartItems', [])])}
             
-            Booking Time: {booking_data.get('createdAt', 'N/A')}
+            Booking Time: {created_at}
             """
             
             msg.attach(MIMEText(body, 'plain'))
             
             # Send email
             with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
+                if self.use_starttls:
+                    server.starttls()
+                if self.sender_password:
+                    server.login(self.sender_email, self.sender_password)
                 server.send_message(msg)
                 
             logger.info("Booking notification email sent successfully")
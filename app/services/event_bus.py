@@ -0,0 +1,162 @@
+"""In-process pub/sub feeding the admin live stream.
+
+Each connected dashboard gets a bounded queue. When a client falls behind,
+the oldest events are dropped and it receives a ``resync`` event telling it
+to refetch its listings, so a slow connection never holds up publishers or
+grows memory.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from bson import ObjectId
+from app.config import settings
+from app.database.connection import db
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    def __init__(self, queue_size: int):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, frame: str):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+def _encode(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+class EventBus:
+    def __init__(self, queue_size: int, max_subscribers: int, source: str = "local"):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.source = source
+        self._subscribers = set()
+        # Publishing may run on the change stream thread while the event loop subscribes
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self):
+        """Register a new stream client; returns None when the client limit is reached"""
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event_type: str, data: dict):
+        """Send an event to every subscriber. Safe to call from any thread."""
+        if not self._subscribers:
+            return
+        frame = f"id: {next(self._ids)}\nevent: {event_type}\ndata: {json.dumps(data, default=_encode)}\n\n"
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.loop is current_loop:
+                subscription.offer(frame)
+            else:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.offer, frame)
+                except RuntimeError:
+                    pass  # Its event loop has closed; the client is gone
+
+    def publish_local(self, event_type: str, data: dict):
+        """Publish from a request handler; skipped when events come from the change stream"""
+        if self.source == "local":
+            self.publish(event_type, data)
+
+    def start(self):
+        if self.source != "changestream" or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="event-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _watch(self):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(CREATED_EVENTS)},
+            "$or": [
+                {"operationType": "insert"},
+                {"operationType": "update", "updateDescription.updatedFields.status": {"$exists": True}}
+            ]
+        }}]
+        resume_token = None
+        while not self._stop.is_set():
+            try:
+                with db.watch(pipeline, resume_after=resume_token, max_await_time_ms=1000) as stream:
+                    while not self._stop.is_set():
+                        change = stream.try_next()
+                        if change is None:
+                            continue
+                        resume_token = stream.resume_token
+                        collection = change["ns"]["coll"]
+                        if change["operationType"] == "insert":
+                            self.publish(CREATED_EVENTS[collection], summarize(collection, change["fullDocument"]))
+                        else:
+                            self.publish(STATUS_EVENTS[collection], {
+                                "id": change["documentKey"]["_id"],
+                                "status": change["updateDescription"]["updatedFields"]["status"],
+                                "updatedAt": datetime.now(timezone.utc)
+                            })
+            except Exception as e:
+                logger.error("Admin event change stream failed, restarting: %s", e)
+                self._stop.wait(1)
+
+CREATED_EVENTS = {
+    "bookings": "booking.created",
+    "insurance_requests": "insurance_request.created",
+    "requests": "car_request.created",
+}
+STATUS_EVENTS = {
+    "bookings": "booking.status",
+    "insurance_requests": "insurance_request.status",
+    "requests": "car_request.status",
+}
+
+SUMMARY_FIELDS = ("brand", "model", "fuelType", "year", "phone", "status", "serviceCenter",
+                  "date", "time", "totalPrice", "companyPolicyName", "createdAt")
+
+def summarize(collection: str, document: dict) -> dict:
+    """The fields a dashboard needs to show a new lead without refetching"""
+    summary = {"id": document.get("_id")}
+    for field in SUMMARY_FIELDS:
+        if field in document:
+            summary[field] = document[field]
+    if collection == "bookings":
+        summary["items"] = len(document.get("cartItems", []))
+    return summary
+
+event_bus = EventBus(
+    queue_size=settings.EVENT_STREAM_QUEUE_SIZE,
+    max_subscribers=settings.EVENT_STREAM_MAX_CLIENTS,
+    source=settings.EVENT_STREAM_SOURCE
+)
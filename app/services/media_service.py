@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+
+# Fingerprinted URLs look like /media/_v/<digest>/brands/bmw_20240101.png
+VERSION_PREFIX = "_v/"
+DIGEST_LENGTH = 16
+READ_CHUNK = 64 * 1024
+
+class MediaStore:
+    """Content digests and bytes of files under MEDIA_ROOT.
+
+    Digests are cached per file and recomputed only when its size or
+    mtime changes. Files up to ``max_file_bytes`` are also kept in an LRU
+    bounded by ``max_bytes`` so hot logos are not read from disk each time.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, max_file_bytes: int, max_digests: int = 100_000):
+        self.root = os.path.realpath(root)
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.max_digests = max_digests
+        self._digests = OrderedDict()
+        self._contents = OrderedDict()
+        self._content_bytes = 0
+        self._lock = threading.Lock()
+
+    def resolve(self, relative_path: str):
+        """(absolute path, stat) of a file under the root, or None"""
+        path = os.path.realpath(os.path.join(self.root, relative_path.lstrip("/")))
+        if not path.startswith(self.root + os.sep):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        return path, stat
+
+    def lookup(self, relative_path: str):
+        """(absolute path, stat, digest) of a file under the root, or None"""
+        resolved = self.resolve(relative_path)
+        if resolved is None:
+            return None
+        return resolved + (self.digest(*resolved),)
+
+    def digest(self, path: str, stat) -> str:
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._digests.get(path)
+            if cached is not None and cached[0] == version:
+                self._digests.move_to_end(path)
+                return cached[1]
+
+        content = self.read(path, stat)
+        if content is not None:
+            digest = hashlib.sha256(content).hexdigest()[:DIGEST_LENGTH]
+        else:
+            hasher = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+                    hasher.update(chunk)
+            digest = hasher.hexdigest()[:DIGEST_LENGTH]
+
+        with self._lock:
+            self._digests[path] = (version, digest)
+            self._digests.move_to_end(path)
+            while len(self._digests) > self.max_digests:
+                self._digests.popitem(last=False)
+        return digest
+
+    def read(self, path: str, stat) -> Optional[bytes]:
+        """Whole content of a small file, from memory when possible; None for large files"""
+        if stat.st_size > self.max_file_bytes:
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._contents.get(path)
+            if cached is not None and cached[0] == version:
+                self._contents.move_to_end(path)
+                return cached[1]
+
+        with open(path, "rb") as f:
+            content = f.read()
+        if len(content) != stat.st_size:
+            # Changed while being read; serve it but don't keep it
+            return content
+
+        with self._lock:
+            previous = self._contents.pop(path, None)
+            if previous is not None:
+                self._content_bytes -= len(previous[1])
+            self._contents[path] = (version, content)
+            self._content_bytes += len(content)
+            while self._content_bytes > self.max_bytes and self._contents:
+                _, (_, evicted) = self._contents.popitem(last=False)
+                self._content_bytes -= len(evicted)
+        return content
+
+media_store = MediaStore(
+    settings.MEDIA_ROOT,
+    max_bytes=settings.MEDIA_CACHE_MAX_BYTES,
+    max_file_bytes=settings.MEDIA_CACHE_MAX_FILE_BYTES
+)
+
+def split_version(relative_path: str) -> tuple:
+    """("<digest>", "brands/x.png") for a fingerprinted path, (None, path) otherwise"""
+    if relative_path.startswith(VERSION_PREFIX):
+        digest, _, rest = relative_path[len(VERSION_PREFIX):].partition("/")
+        if digest and rest:
+            return digest, rest
+    return None, relative_path
+
+def media_url(relative_path: str) -> str:
+    """Public URL of a media file, fingerprinted with its content digest when it exists"""
+    relative_path = split_version(relative_path.lstrip("/"))[1]
+    found = media_store.lookup(relative_path)
+    if found is None:
+        return f"{settings.MEDIA_URL}{relative_path}"
+    return f"{settings.MEDIA_URL}{VERSION_PREFIX}{found[2]}/{relative_path}"
+
+def versioned_url(url: Optional[str]) -> Optional[str]:
+    """Fingerprint a stored media URL; other URLs (CDN, external) are returned unchanged"""
+    if not url or not url.startswith(settings.MEDIA_URL):
+        return url
+    return media_url(url[len(settings.MEDIA_URL):])
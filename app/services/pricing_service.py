@@ -0,0 +1,125 @@
+from pymongo import UpdateOne
+from bson import ObjectId
+from app.database.connection import db
+from app.models.pricing import PackagePrice, canonical_key
+import logging
+
+logger = logging.getLogger(__name__)
+
+def flatten_pricing(package_id, pricing: dict) -> list:
+    """Turn an embedded brands -> models -> fuelTypes tree into package_prices rows"""
+    rows = {}
+    brands = (pricing or {}).get("brands", {}) or {}
+    for brand_name, brand_data in brands.items():
+        models = (brand_data or {}).get("models", {}) or {}
+        for model_name, model_data in models.items():
+            fuel_types = (model_data or {}).get("fuelTypes", {}) or {}
+            for fuel_name, fuel_data in fuel_types.items():
+                if not isinstance(fuel_data, dict) or not fuel_data:
+                    continue
+                price = fuel_data.get("basePrice", 0)
+                row = PackagePrice(
+                    package_id=str(package_id),
+                    brand_key=canonical_key(brand_name),
+                    model_key=canonical_key(model_name),
+                    fuel=canonical_key(fuel_name),
+                    brand=brand_name,
+                    model=model_name,
+                    fuelType=fuel_name,
+                    basePrice=price,
+                    discountedPrice=fuel_data.get("discountedPrice", price),
+                    Extra=fuel_data.get("Extra", ""),
+                    Extra1=fuel_data.get("Extra1", "")
+                )
+                key = (row.brand_key, row.model_key, row.fuel)
+                # The embedded lookup returned the first case-insensitive match
+                rows.setdefault(key, row.dict())
+    return list(rows.values())
+
+def sync_package_prices(package_id, pricing: dict) -> int:
+    """Replace the normalized rows of one package and flag it as migrated"""
+    package_id = str(package_id)
+    rows = flatten_pricing(package_id, pricing)
+    revision = ObjectId()
+    if rows:
+        db.package_prices.bulk_write([
+            UpdateOne(
+                {
+                    "package_id": row["package_id"],
+                    "brand_key": row["brand_key"],
+                    "model_key": row["model_key"],
+                    "fuel": row["fuel"]
+                },
+                {"$set": {**row, "revision": revision}},
+                upsert=True
+            )
+            for row in rows
+        ], ordered=False)
+
+    # Drop rows for brand/model/fuel combinations no longer in the tree
+    db.package_prices.delete_many({"package_id": package_id, "revision": {"$ne": revision}})
+
+    db.service_packages.update_one(
+        {"_id": ObjectId(package_id)},
+        {"$set": {"pricingMigrated": True}}
+    )
+    return len(rows)
+
+def sync_or_fall_back(package_id, pricing: dict) -> bool:
+    """sync_package_prices, leaving the package on its embedded pricing if that fails.
+
+    The package document is already written by then; failing the request
+    would report an error for a change that was saved.
+    """
+    try:
+        sync_package_prices(package_id, pricing)
+        return True
+    except Exception as e:
+        logger.error("Failed to sync package_prices for %s, using embedded pricing: %s",
+                     package_id, e, exc_info=True)
+        db.service_packages.update_one({"_id": ObjectId(str(package_id))}, {"$set": {"pricingMigrated": False}})
+        return False
+
+def find_prices(package_ids: list, brand: str, model: str, fuel_type: str) -> dict:
+    """Look up prices for many packages at once, keyed by package_id"""
+    if not package_ids:
+        return {}
+    cursor = db.package_prices.find(
+        {
+            "package_id": {"$in": [str(pid) for pid in package_ids]},
+            "brand_key": canonical_key(brand),
+            "model_key": canonical_key(model),
+            "fuel": canonical_key(fuel_type),
+            # Fuel types matched exactly in the embedded tree; keep that for migrated packages
+            "fuelType": fuel_type
+        },
+        {"_id": 0, "package_id": 1, "basePrice": 1, "discountedPrice": 1, "Extra": 1, "Extra1": 1}
+    )
+    return {row["package_id"]: row for row in cursor}
+
+def find_embedded_price(pkg: dict, brand: str, model: str, fuel_type: str):
+    """Legacy lookup against the embedded pricing tree, for unmigrated packages"""
+    brand_lower = brand.lower()
+    model_lower = model.lower()
+
+    brands = pkg.get("pricing", {}).get("brands", {})
+    brand_data = next((v for k, v in brands.items() if k.lower() == brand_lower), None)
+    if not brand_data:
+        return None
+
+    models = brand_data.get("models", {})
+    model_data = next((v for k, v in models.items() if k.lower() == model_lower), None)
+    if not model_data:
+        return None
+
+    fuel_data = model_data.get("fuelTypes", {}).get(fuel_type)
+    if not fuel_data:
+        return None
+
+    price = fuel_data.get("basePrice", 0)
+    return {
+        "basePrice": price,
+        "discountedPrice": fuel_data.get("discountedPrice", price),
+        "Extra": fuel_data.get("Extra", ""),
+        "Extra1": fuel_data.get("Extra1", "")
+    }
@@ -0,0 +1,217 @@
+"""Sampling profiler and MongoDB command timing.
+
+Stacks are collected with ``sys._current_frames()`` from a separate thread
+and stored in the folded format flamegraph tools read
+(``thread;outer;...;inner count``). Nothing here imports the database, so
+the command listener can be handed to MongoClient at connection time.
+"""
+from collections import Counter
+from contextvars import ContextVar
+import logging
+import os
+import sys
+import threading
+import time
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 64
+
+# Mongo commands issued while a profiled request is running are appended here
+_active_commands: ContextVar = ContextVar("profile_commands", default=None)
+
+def _folded_stack(frame, thread_name: str) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names))
+
+def sample_threads(counter: Counter, skip: set):
+    """Add one sample of every thread's stack (except ``skip``) to ``counter``"""
+    names = {t.ident: t.name for t in threading.enumerate()}
+    for ident, frame in sys._current_frames().items():
+        if ident not in skip:
+            counter[_folded_stack(frame, names.get(ident, str(ident)))] += 1
+
+def to_folded(counter: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in counter.most_common())
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Times MongoDB commands for requests that are being profiled; a no-op otherwise"""
+
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        if _active_commands.get() is None:
+            return
+        # For most commands the value of the command name is the collection
+        target = event.command.get(event.command_name)
+        self._pending[(event.connection_id, event.request_id)] = (
+            event.command_name,
+            target if isinstance(target, str) else None
+        )
+
+    def _finish(self, event, ok: bool):
+        commands = _active_commands.get()
+        if commands is None:
+            return
+        name, collection = self._pending.pop((event.connection_id, event.request_id), (event.command_name, None))
+        commands.append({
+            "command": name,
+            "collection": collection,
+            "ms": round(event.duration_micros / 1000, 3),
+            "ok": ok
+        })
+
+    def succeeded(self, event):
+        self._finish(event, True)
+
+    def failed(self, event):
+        self._finish(event, False)
+
+command_timer = MongoCommandTimer()
+
+class RequestProfile:
+    """Profile one request: samples all threads while it runs and records its Mongo commands.
+
+    Samples cover the whole process, so under concurrent load they include
+    other requests too; the Mongo command list is exact for this request.
+    """
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self.commands = []
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._token = None
+        self._started = None
+        self.wall_ms = 0
+
+    def _run(self):
+        skip = {threading.get_ident()}
+        while not self._stop.wait(self.interval):
+            sample_threads(self.stacks, skip)
+            self.samples += 1
+
+    def start(self):
+        self._token = _active_commands.set(self.commands)
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop recording; doesn't block. Call join() (off the event loop) before report()."""
+        self._stop.set()
+        self.wall_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        _active_commands.reset(self._token)
+
+    def join(self):
+        self._thread.join()
+
+    def report(self) -> dict:
+        return {
+            "wall_ms": self.wall_ms,
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "mongo": {
+                "count": len(self.commands),
+                "total_ms": round(sum(c["ms"] for c in self.commands), 3),
+                "commands": self.commands
+            },
+            "folded": to_folded(self.stacks)
+        }
+
+class BackgroundSampler:
+    """Low-rate, always-on sampler writing folded stacks to files.
+
+    Only the newest ``max_files`` files, up to ``max_bytes`` in total, are kept
+    in ``output_dir`` (across all workers); older ones are deleted on flush.
+
+    The time spent taking samples is measured; whenever it would exceed
+    ``max_overhead`` of wall time the sampling interval is doubled, and it
+    relaxes back towards the configured rate once there is headroom.
+    """
+
+    def __init__(self, hz: float, max_overhead: float, flush_seconds: float, output_dir,
+                 max_files: int = 100, max_bytes: int = 50 * 1024 * 1024):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.base_interval = 1 / hz
+        self.interval = self.base_interval
+        self.max_overhead = max_overhead
+        self.flush_seconds = flush_seconds
+        self.output_dir = output_dir
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="background-sampler", daemon=True)
+        self._thread.start()
+        logger.info("Background sampler started at %.1f Hz", 1 / self.interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        skip = {threading.get_ident()}
+        next_flush = time.monotonic() + self.flush_seconds
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            sample_threads(self.stacks, skip)
+            cost = time.perf_counter() - started
+
+            if cost > self.interval * self.max_overhead:
+                self.interval = min(self.interval * 2, 10.0)
+            elif cost < self.interval * self.max_overhead / 4 and self.interval > self.base_interval:
+                self.interval = max(self.interval / 2, self.base_interval)
+
+            if time.monotonic() >= next_flush:
+                self.flush()
+                next_flush = time.monotonic() + self.flush_seconds
+
+    def flush(self):
+        if not self.stacks:
+            return
+        stacks, self.stacks = self.stacks, Counter()
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"sampler-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+            path.write_text(to_folded(stacks))
+        except OSError as e:
+            logger.error("Could not write sampler output: %s", e)
+            return
+        self.prune()
+
+    def prune(self):
+        """Delete the oldest sampler files beyond max_files / max_bytes"""
+        files = []
+        for path in self.output_dir.glob("sampler-*.folded"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Pruned by another worker
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort(reverse=True)
+        kept_bytes = 0
+        for index, (_, size, path) in enumerate(files):
+            kept_bytes += size
+            if index >= self.max_files or kept_bytes > self.max_bytes:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
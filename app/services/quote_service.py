@@ -0,0 +1,76 @@
+"""Server-side cart pricing.
+
+A vehicle's price table (every package priced for one brand/model/fuel) is
+loaded with a single indexed query on package_prices and cached until the
+catalog changes; pricing a cart is then one pass over its items with dict
+lookups, however many packages it holds.
+"""
+from app.database.connection import db
+from app.models.pricing import canonical_key
+from app.services.cache import CollectionCache
+from app.services.pricing_service import find_embedded_price
+
+_catalog_cache = CollectionCache(["service_packages"])
+_vehicle_cache = CollectionCache(["service_packages", "package_prices"])
+
+def _load_catalog() -> dict:
+    """Package names by id, plus the embedded pricing of packages not yet migrated"""
+    return {
+        "names": {
+            str(pkg["_id"]): pkg["name"]
+            for pkg in db.service_packages.find({"pricingMigrated": True}, {"name": 1})
+        },
+        "legacy": list(db.service_packages.find(
+            {"pricingMigrated": {"$ne": True}}, {"name": 1, "pricing": 1}
+        ))
+    }
+
+def _load_vehicle_table(brand: str, model: str, fuel_type: str):
+    catalog = _catalog_cache.get_or_load("catalog", _load_catalog)
+    table = {}
+    for row in db.package_prices.find(
+        {"brand_key": canonical_key(brand), "model_key": canonical_key(model),
+         "fuel": canonical_key(fuel_type), "fuelType": fuel_type},
+        {"_id": 0, "package_id": 1, "basePrice": 1, "discountedPrice": 1}
+    ):
+        name = catalog["names"].get(row["package_id"])
+        if name:
+            table[canonical_key(name)] = (name, row["basePrice"], row["discountedPrice"])
+    for pkg in catalog["legacy"]:
+        prices = find_embedded_price(pkg, brand, model, fuel_type)
+        if prices:
+            table.setdefault(canonical_key(pkg["name"]), (pkg["name"], prices["basePrice"], prices["discountedPrice"]))
+    # Empty tables are not cached, so unknown vehicles cannot fill the cache
+    return table or None
+
+def get_vehicle_table(brand: str, model: str, fuel_type: str) -> dict:
+    # Fuel types are matched exactly, as in the embedded pricing tree
+    key = (canonical_key(brand), canonical_key(model), fuel_type)
+    return _vehicle_cache.get_or_load(key, lambda: _load_vehicle_table(brand, model, fuel_type)) or {}
+
+def price_cart(table: dict, items: list) -> dict:
+    """Price ``items`` ({"packageName", "quantity"}) against a vehicle price table"""
+    lines = []
+    unavailable = []
+    total = 0
+    for item in items:
+        entry = table.get(canonical_key(item["packageName"]))
+        if entry is None:
+            unavailable.append(item["packageName"])
+            continue
+        name, base_price, unit_price = entry
+        unit_price = unit_price if unit_price is not None else base_price
+        line_total = (unit_price or 0) * item["quantity"]
+        total += line_total
+        lines.append({
+            "packageName": name,
+            "quantity": item["quantity"],
+            "basePrice": base_price,
+            "unitPrice": unit_price,
+            "lineTotal": line_total
+        })
+    return {"items": lines, "unavailable": unavailable, "total": total}
+
+def quote_cart(brand: str, model: str, fuel_type: str, items: list) -> dict:
+    quote = price_cart(get_vehicle_table(brand, model, fuel_type), items)
+    return {"brand": brand, "model": model, "fuelType": fuel_type, **quote}
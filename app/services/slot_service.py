@@ -0,0 +1,145 @@
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime
+from app.database.connection import db
+from app.config import settings
+from app.models.pricing import canonical_key
+import logging
+import pytz
+import re
+
+logger = logging.getLogger(__name__)
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+CANCELLED = "cancelled"
+
+def _slot_id(center_key: str, date: str, time: str) -> str:
+    return f"{center_key}|{date}|{time}"
+
+def _is_known_center(service_center: str, center: dict) -> bool:
+    if center:
+        return True
+    if settings.SERVICE_CENTERS:
+        return canonical_key(service_center) in {canonical_key(c) for c in settings.SERVICE_CENTERS}
+    # No centers configured anywhere: accept any name
+    return db.service_centers.estimated_document_count() == 0
+
+def get_center_config(service_center: str) -> dict:
+    """Capacity and slot template for a service center, falling back to settings"""
+    center = db.service_centers.find_one(
+        {"key": canonical_key(service_center)},
+        {"_id": 0, "slotCapacity": 1, "slotTimes": 1, "timezone": 1}
+    )
+    return {
+        "known": _is_known_center(service_center, center),
+        "tz": (center or {}).get("timezone") or settings.SLOT_TZ,
+        "capacity": int((center or {}).get("slotCapacity") or settings.SLOT_DEFAULT_CAPACITY),
+        "times": (center or {}).get("slotTimes") or settings.SLOT_TIMES
+    }
+
+def validate_slot(service_center: str, date: str, time: str = None) -> dict:
+    """The center's config, or ValueError unless center, date and time are bookable.
+
+    Only the exact template spellings of times are accepted, so capacity cannot
+    be sidestepped by spelling a slot differently.
+    """
+    if not DATE_PATTERN.match(date or ""):
+        raise ValueError("date must be in YYYY-MM-DD format")
+    try:
+        day = datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("date must be in YYYY-MM-DD format")
+    config = get_center_config(service_center)
+    if not config["known"]:
+        raise ValueError(f"Unknown service center: {service_center}")
+    if day < datetime.now(pytz.timezone(config["tz"])).date():
+        raise ValueError("date is in the past")
+    if time is not None and time not in config["times"]:
+        raise ValueError(f"time must be one of: {', '.join(config['times'])}")
+    return config
+
+def get_availability(service_center: str, date: str) -> list:
+    """Booked and free capacity per template slot. Read-only: counters are
+    created by the first reservation of a slot."""
+    config = validate_slot(service_center, date)
+    capacity = config["capacity"]
+    counters = {
+        doc["time"]: doc.get("booked", 0)
+        for doc in db.slot_counters.find(
+            {"center_key": canonical_key(service_center), "date": date},
+            {"_id": 0, "time": 1, "booked": 1}
+        )
+    }
+    return [
+        {
+            "time": time,
+            "capacity": capacity,
+            "booked": counters.get(time, 0),
+            "available": max(capacity - counters.get(time, 0), 0)
+        }
+        for time in config["times"]
+    ]
+
+def reserve_slot(service_center: str, date: str, time: str, config: dict = None) -> bool:
+    """Atomically take one unit of capacity. Returns False when the slot is full.
+
+    Callers validate the slot first (validate_slot) and may pass its config.
+    """
+    center_key = canonical_key(service_center)
+    capacity = (config or get_center_config(service_center))["capacity"]
+    slot_id = _slot_id(center_key, date.strip(), time.strip())
+
+    try:
+        db.slot_counters.update_one(
+            {"_id": slot_id},
+            {"$setOnInsert": {
+                "center_key": center_key,
+                "serviceCenter": service_center,
+                "date": date.strip(),
+                "time": time.strip(),
+                "booked": 0
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        pass  # Another request created the counter first
+
+    # The capacity check and the increment happen in one server-side operation
+    counter = db.slot_counters.find_one_and_update(
+        {"_id": slot_id, "booked": {"$lt": capacity}},
+        {"$inc": {"booked": 1}},
+        projection={"_id": 0, "booked": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return counter is not None
+
+def release_slot(service_center: str, date: str, time: str):
+    """Give back a unit of capacity taken by reserve_slot"""
+    slot_id = _slot_id(canonical_key(service_center), date.strip(), time.strip())
+    db.slot_counters.update_one(
+        {"_id": slot_id, "booked": {"$gt": 0}},
+        {"$inc": {"booked": -1}}
+    )
+
+def apply_status_change(booking: dict, old_status, new_status) -> bool:
+    """Keep a booking's slot in step with its status.
+
+    Cancelling gives the slot back; moving out of cancelled takes it again.
+    Returns False, changing nothing, when the slot has filled up meanwhile.
+    Only bookings that took their slot through reserve_slot (``slotHeld`` is
+    set) are counted; older bookings never held a counter.
+    """
+    held = booking.get("slotHeld")
+    if held is None or (old_status == CANCELLED) == (new_status == CANCELLED):
+        return True
+    center, date, time = booking["serviceCenter"], booking["date"], booking["time"]
+    if new_status == CANCELLED:
+        if held:
+            release_slot(center, date, time)
+            db.bookings.update_one({"_id": booking["_id"]}, {"$set": {"slotHeld": False}})
+        return True
+    if not held:
+        if not reserve_slot(center, date, time):
+            return False
+        db.bookings.update_one({"_id": booking["_id"]}, {"$set": {"slotHeld": True}})
+    return True
@@ -0,0 +1,97 @@
+"""Memory and throughput of the /car/all-brands read path, no database needed.
+
+Compares the previous path (raw pymongo dicts cached, validated through
+response_model=List[CarBrand] and re-encoded on every request) with the
+current one (slotted CarBrandRecords built once per cache load and the
+response body pre-rendered):
+
+    python -m benchmarks.catalog_records [--brands 60] [--models 80] [--repeat 50]
+
+Memory is what the cache retains (tracemalloc), throughput is per request.
+"""
+import argparse
+import copy
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.models.car import CarBrand
+from app.models.records import CarBrandRecord, dumps
+from benchmarks.seed import catalog
+
+def retained_bytes(build):
+    """(value, bytes still allocated by build() once it returns)"""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+def dict_request(docs: list) -> bytes:
+    # What FastAPI did per request: validate against the response model,
+    # encode, then render the JSONResponse
+    brands = [CarBrand(**doc) for doc in docs]
+    content = jsonable_encoder(brands)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def record_load(docs: list) -> bytes:
+    return dumps([CarBrandRecord.from_doc(doc).to_dict() for doc in docs])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--brands", type=int, default=60)
+    parser.add_argument("--models", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(5)
+    source = catalog(args.brands, args.models)
+    for doc in source:
+        doc["_id"] = ObjectId()
+
+    # Fresh copies stand in for what pymongo decodes on each cache load
+    dict_cache, dict_bytes = retained_bytes(lambda: copy.deepcopy(source))
+    records, record_bytes = retained_bytes(lambda: tuple(CarBrandRecord.from_doc(doc) for doc in source))
+    body, body_bytes = retained_bytes(lambda: record_load(source))
+
+    assert json.loads(dict_request(dict_cache)) == json.loads(body), "record output differs from the model output"
+
+    report = {
+        "catalog": {"brands": args.brands, "models": args.brands * args.models},
+        "retained_bytes": {
+            "dicts": dict_bytes,
+            "records": record_bytes,
+            "rendered_body": body_bytes,
+        },
+        "per_load_ms": {
+            "dicts": timed(lambda: copy.deepcopy(source), args.repeat),
+            "records_and_body": timed(lambda: record_load(source), args.repeat),
+        },
+        "per_request_ms": {
+            "dicts_and_model": timed(lambda: dict_request(dict_cache), args.repeat),
+            "rendered_body": timed(lambda: bytes(body), args.repeat),
+        },
+    }
+    report["requests_per_second"] = {
+        name: round(1000 / ms, 1) if ms else None for name, ms in report["per_request_ms"].items()
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Request latency with logging off, with the old logging pattern, and with the new one.
+
+Runs an in-process FastAPI app through httpx's ASGI transport (no network,
+no database). The handler mimics the logging of get_service_packages:
+"old" logs at INFO with f-strings once per included package through a
+synchronous StreamHandler; "new" uses the queue-based JSON setup with lazy
+arguments and sampled per-package debug logs. Output goes to /dev/null.
+
+    python -m benchmarks.logging_overhead [--requests 2000] [--packages 40]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.config.logging_config import log_sampled, setup_logging, shutdown_logging
+from app.middleware.request_id import RequestIdMiddleware
+
+logger = logging.getLogger("benchmarks.logging_overhead")
+
+def build_app(mode: str, packages: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+    rows = [{"name": f"Package {i}", "price": 1000 + i} for i in range(packages)]
+
+    @app.get("/packages")
+    async def packages_route(brand: str = "BMW", model: str = "X1"):
+        result = []
+        if mode == "old":
+            logger.info(f"Received request: brand={brand}, model={model}")
+        elif mode == "new":
+            logger.debug("Received request: brand=%s, model=%s", brand, model)
+        for row in rows:
+            result.append({**row, "brand": brand})
+            if mode == "old":
+                logger.info(f"Included package: {row['name']} for {brand} {model}")
+            elif mode == "new":
+                log_sampled(logger, logging.DEBUG, "Included package: %s for %s %s", row["name"], brand, model)
+        if mode == "old":
+            logger.info(f"Returning {len(result)} packages")
+        return result
+
+    return app
+
+def configure(mode: str, devnull):
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if mode == "old":
+        handler = logging.StreamHandler(devnull)
+        handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    elif mode == "new":
+        setup_logging(level="INFO", fmt="json", stream=devnull)
+    else:
+        root.setLevel(logging.CRITICAL)
+
+async def measure(app: FastAPI, count: int) -> list:
+    timings = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.get("/packages")
+            timings.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--packages", type=int, default=40)
+    args = parser.parse_args()
+
+    report = {}
+    with open(os.devnull, "w") as devnull:
+        for mode in ("off", "old", "new"):
+            configure(mode, devnull)
+            timings = asyncio.run(measure(build_app(mode, args.packages), args.requests))
+            timings.sort()
+            report[mode] = {
+                "mean_ms": round(statistics.fmean(timings), 3),
+                "p50_ms": round(timings[len(timings) // 2], 3),
+                "p99_ms": round(timings[int(len(timings) * 0.99) - 1], 3),
+            }
+        shutdown_logging()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
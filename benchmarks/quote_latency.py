@@ -0,0 +1,85 @@
+"""Cart quote latency against a local mongod.
+
+Compares pricing a cart the old way (one package fetch plus an embedded
+pricing-tree scan per item, as calling get_service_packages per item did)
+with quote_cart, cold (empty cache) and warm.
+
+    python -m benchmarks.quote_latency [--brands 60] [--models 40] [--packages 200]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_TLS", "false")
+os.environ.setdefault("DB_NAME", "drvyn_bench_quote")
+
+from app.database.connection import db  # noqa: E402
+from app.database.indexes import ensure_indexes  # noqa: E402
+from app.services import quote_service  # noqa: E402
+from app.services.pricing_service import find_embedded_price, sync_package_prices  # noqa: E402
+from benchmarks.seed import catalog, package  # noqa: E402
+
+def legacy_quote(brand, model, fuel, items):
+    total = 0
+    for item in items:
+        pkg = db.service_packages.find_one({"name": item["packageName"]}, {"_id": 0})
+        prices = find_embedded_price(pkg, brand, model, fuel) if pkg else None
+        if prices:
+            total += prices["discountedPrice"] * item["quantity"]
+    return total
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--brands", type=int, default=60)
+    parser.add_argument("--models", type=int, default=40)
+    parser.add_argument("--packages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(11)
+    for name in ("service_packages", "package_prices"):
+        db[name].drop()
+    ensure_indexes()
+    brands = catalog(args.brands, args.models)
+    for i in range(args.packages):
+        # Every package prices every brand so any cart is fully priceable
+        doc = package(i, brands)
+        db.service_packages.insert_one(doc)
+        sync_package_prices(doc["_id"], doc["pricing"])
+
+    brand = brands[0]
+    model = brand["models"][0]
+    fuel = model["fuel_types"][0]
+    names = [doc["name"] for doc in db.service_packages.find({}, {"name": 1})]
+
+    report = {}
+    for size in (1, 10, 50, 200):
+        items = [{"packageName": names[i % len(names)], "quantity": 1} for i in range(size)]
+
+        def cold():
+            quote_service._catalog_cache.clear()
+            quote_service._vehicle_cache.clear()
+            quote_service.quote_cart(brand["brand"], model["name"], fuel, items)
+
+        report[f"cart_{size}"] = {
+            "legacy_ms": timed(lambda: legacy_quote(brand["brand"], model["name"], fuel, items), args.repeat),
+            "quote_cold_ms": timed(cold, args.repeat),
+            "quote_warm_ms": timed(lambda: quote_service.quote_cart(brand["brand"], model["name"], fuel, items),
+                                   args.repeat),
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
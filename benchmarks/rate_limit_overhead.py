@@ -0,0 +1,64 @@
+"""Measure the per-request overhead of RateLimitMiddleware.
+
+Calls a no-op ASGI app directly (no network, no database) with and without
+the middleware in front of it, using a fresh client IP and phone per request
+so every call goes through bucket creation.
+
+    python -m benchmarks.rate_limit_overhead [--requests 50000]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.middleware.rate_limit import RateLimitMiddleware
+
+LIMITS = {"/api/submit-booking": {"ip": [10, 60], "phone": [5, 600]}}
+
+async def noop_app(scope, receive, send):
+    while (await receive()).get("more_body"):
+        pass
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def run(app, count: int, path: str) -> float:
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(count):
+        body = json.dumps({"phone": f"98{i:08d}", "brand": "BMW", "model": "X1"}).encode()
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        scope = {"type": "http", "method": "POST", "path": path, "headers": [],
+                 "client": (f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", 1234)}
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / count * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50000)
+    args = parser.parse_args()
+
+    limited = RateLimitMiddleware(noop_app, LIMITS)
+    baseline = asyncio.run(run(noop_app, args.requests, "/api/submit-booking"))
+    unlimited_route = asyncio.run(run(limited, args.requests, "/api/other"))
+    limited_route = asyncio.run(run(limited, args.requests, "/api/submit-booking"))
+
+    print(json.dumps({
+        "requests": args.requests,
+        "baseline_us": round(baseline, 2),
+        "passthrough_route_us": round(unlimited_route, 2),
+        "limited_route_us": round(limited_route, 2),
+        "overhead_us": round(limited_route - baseline, 2)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
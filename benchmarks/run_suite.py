@@ -0,0 +1,262 @@
+"""End-to-end load benchmark for app.main:app.
+
+Boots the API with uvicorn against a local mongod, with a local SMTP sink
+standing in for the mail server, seeds synthetic data (see benchmarks/seed.py),
+runs scripted scenarios and writes throughput and p50/p95/p99 latency per
+endpoint as JSON:
+
+    python -m benchmarks.run_suite --out bench.json
+    python -m benchmarks.run_suite --skip-seed --baseline bench.json --out bench2.json
+
+Requires a mongod reachable at --uri (no replica set needed).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from pymongo import MongoClient
+
+from benchmarks.seed import load_context, seed
+from benchmarks.smtp_sink import SMTPSink
+
+ADMIN_USER = "bench-admin"
+ADMIN_PASSWORD = "bench-password"
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, endpoint: str, elapsed_ms: float, ok: bool):
+        timings, errors = self.samples.setdefault(endpoint, ([], [0]))
+        timings.append(elapsed_ms)
+        if not ok:
+            errors[0] += 1
+
+    def report(self, wall_seconds: float) -> dict:
+        out = {}
+        for endpoint, (timings, errors) in sorted(self.samples.items()):
+            ordered = sorted(timings)
+            out[endpoint] = {
+                "requests": len(ordered),
+                "errors": errors[0],
+                "throughput_rps": round(len(ordered) / wall_seconds, 2),
+                "p50_ms": round(percentile(ordered, 50), 2),
+                "p95_ms": round(percentile(ordered, 95), 2),
+                "p99_ms": round(percentile(ordered, 99), 2),
+            }
+        return out
+
+def percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+async def timed(client, recorder, endpoint: str, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 500
+    except httpx.HTTPError:
+        response, ok = None, False
+    recorder.add(endpoint, (time.perf_counter() - started) * 1000, ok)
+    return response
+
+def pick_vehicle(ctx):
+    brand = random.choice(ctx["brands"])
+    model = random.choice(brand["models"])
+    return brand["brand"], model["name"], random.choice(model["fuel_types"])
+
+async def catalog_browsing(client, ctx, recorder, headers):
+    await timed(client, recorder, "GET /car/all-brands", "GET", "/car/all-brands")
+    await timed(client, recorder, "GET /car/brand-logos", "GET", "/car/brand-logos")
+    await timed(client, recorder, "GET /api/blog", "GET", "/api/blog")
+
+async def package_lookup(client, ctx, recorder, headers):
+    pkg = random.choice(ctx["packages"])
+    brand = random.choice(pkg["brands"])
+    models = next(b["models"] for b in ctx["brands"] if b["brand"] == brand)
+    model = random.choice(models)
+    await timed(client, recorder, "GET /api/service-packages", "GET", "/api/service-packages", params={
+        "category": pkg["category"], "brand": brand, "model": model["name"],
+        "fuel_type": random.choice(model["fuel_types"])
+    })
+
+async def booking_burst(client, ctx, recorder, headers):
+    pkg = random.choice(ctx["packages"])
+    brand = random.choice(pkg["brands"])
+    model = random.choice(next(b["models"] for b in ctx["brands"] if b["brand"] == brand))
+    day = (datetime.now(timezone.utc) + timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%d")
+    await timed(client, recorder, "POST /api/submit-booking", "POST", "/api/submit-booking", json={
+        "brand": brand, "model": model["name"], "fuelType": model["fuel_types"][0],
+        "year": "2020", "phone": f"9{random.randint(0, 999999999):09d}",
+        "date": day, "time": random.choice(ctx["slot_times"]), "address": "1 Bench Road",
+        "serviceCenter": random.choice(ctx["service_centers"]),
+        "totalPrice": 1000, "cartItems": [{"packageName": pkg["name"], "price": 1000, "quantity": 1}]
+    })
+
+async def admin_paging(client, ctx, recorder, headers):
+    skip = random.choice([0, 0, 50, 100, 500, 5000])
+    await timed(client, recorder, "GET /admin/bookings", "GET", "/admin/bookings",
+                params={"skip": skip, "limit": 50}, headers=headers)
+    await timed(client, recorder, "GET /admin/insurance-requests", "GET", "/admin/insurance-requests",
+                params={"skip": skip, "limit": 50}, headers=headers)
+    await timed(client, recorder, "GET /admin/car-requests", "GET", "/admin/car-requests",
+                params={"skip": skip, "limit": 50}, headers=headers)
+
+async def dashboard(client, ctx, recorder, headers):
+    await timed(client, recorder, "GET /admin/dashboard/stats", "GET", "/admin/dashboard/stats", headers=headers)
+
+SCENARIOS = {
+    "catalog_browsing": catalog_browsing,
+    "package_lookup": package_lookup,
+    "booking_burst": booking_burst,
+    "admin_paging": admin_paging,
+    "dashboard": dashboard,
+}
+
+async def run_scenario(base_url, scenario, ctx, headers, concurrency: int, duration: float) -> dict:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker():
+            while time.perf_counter() < deadline:
+                await scenario(client, ctx, recorder, headers)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+    return recorder.report(wall)
+
+def start_server(args, smtp_port: int):
+    env = dict(os.environ)
+    env.update({
+        "MONGODB_URI": args.uri,
+        "MONGODB_TLS": "false",
+        "DB_NAME": args.db,
+        "ADMIN_USERMANE": ADMIN_USER,
+        "ADMIN_PASSWORD": ADMIN_PASSWORD,
+        "ADMIN_EMAILS": "ops@bench.local",
+        "SMTP_SERVER": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_EMAIL": "bench@bench.local",
+        "SMTP_PASSWORD": "",
+        "SMTP_STARTTLS": "false",
+        "RATE_LIMIT_ENABLED": "false",
+        "LOG_LEVEL": args.log_level,
+    })
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning"],
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(f"{base_url}/", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("API server did not start within 60s")
+
+def compare(report: dict, baseline: dict) -> dict:
+    """Percentage change per endpoint metric against a previous report"""
+    deltas = {}
+    for scenario, endpoints in report["scenarios"].items():
+        for endpoint, stats in endpoints.items():
+            before = baseline.get("scenarios", {}).get(scenario, {}).get(endpoint)
+            if not before:
+                continue
+            deltas[f"{scenario}: {endpoint}"] = {
+                metric: round((stats[metric] - before[metric]) / before[metric] * 100, 1)
+                for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms") if before[metric]
+            }
+    return deltas
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="drvyn_bench")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20, help="seconds per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--brands", type=int, default=60)
+    parser.add_argument("--models", type=int, default=40)
+    parser.add_argument("--packages", type=int, default=30)
+    parser.add_argument("--bookings", type=int, default=200_000)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--baseline", help="previous report to compare against")
+    parser.add_argument("--out", default="-")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    db = MongoClient(args.uri)[args.db]
+    if not args.skip_seed:
+        seed(db, args.brands, args.models, args.packages, args.bookings, args.seed)
+        os.environ.update({"MONGODB_URI": args.uri, "DB_NAME": args.db, "MONGODB_TLS": "false"})
+        from benchmarks.seed import migrate_prices
+        migrate_prices()
+    ctx = load_context(db)
+
+    sink = SMTPSink()
+    smtp_port = sink.start()
+    process, base_url = start_server(args, smtp_port)
+    try:
+        token = httpx.post(f"{base_url}/admin/login",
+                           json={"username": ADMIN_USER, "password": ADMIN_PASSWORD}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        report = {
+            "meta": {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "concurrency": args.concurrency,
+                "duration_s": args.duration,
+                "workers": args.workers,
+                "brands": len(ctx["brands"]),
+                "models": sum(len(b["models"]) for b in ctx["brands"]),
+                "packages": len(ctx["packages"]),
+                "bookings": db.bookings.estimated_document_count(),
+            },
+            "scenarios": {}
+        }
+        for name in args.scenarios.split(","):
+            report["scenarios"][name] = asyncio.run(run_scenario(
+                base_url, SCENARIOS[name], ctx, headers, args.concurrency, args.duration
+            ))
+        report["meta"]["emails_received"] = sink.messages
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        sink.stop()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["delta_pct"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.out == "-":
+        print(output)
+    else:
+        with open(args.out, "w") as f:
+            f.write(output)
+
+if __name__ == "__main__":
+    main()
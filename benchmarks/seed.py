@@ -0,0 +1,183 @@
+"""Seed a local database with synthetic but realistically shaped data.
+
+    python -m benchmarks.seed [--brands 60] [--models 40] [--packages 30] [--bookings 200000]
+
+Writes straight through pymongo (no app import), then runs the
+package_prices migration and the booking rollup rebuild so the priced and
+analytics read paths have data.
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+from pymongo import MongoClient
+
+FUELS = ["Petrol", "Diesel", "CNG", "Electric", "Hybrid"]
+CATEGORIES = ["Periodic Services", "AC Service & Repair", "Batteries", "Tyres & Wheel Care",
+              "Denting & Painting", "Detailing Services", "Car Spa & Cleaning", "Clutch & Body Parts"]
+SERVICE_CENTERS = [f"Bench Center {i}" for i in range(8)]
+STATUSES = ["pending", "pending", "confirmed", "completed", "completed", "completed", "cancelled"]
+SLOT_TIMES = ["09:00 AM", "10:00 AM", "11:00 AM", "12:00 PM", "01:00 PM",
+              "02:00 PM", "03:00 PM", "04:00 PM", "05:00 PM", "06:00 PM"]
+
+def catalog(brand_count: int, model_count: int) -> list:
+    brands = []
+    for b in range(brand_count):
+        brand = f"Brand{b:03d}"
+        brands.append({
+            "brand": brand,
+            "logoUrl": f"/media/brands/{brand}.png",
+            "models": [
+                {
+                    "name": f"Model {b:03d}-{m:03d}",
+                    "imageUrl": f"/media/models/{brand}/Model {m:03d}.png",
+                    "fuel_types": random.sample(FUELS, random.randint(1, 3))
+                }
+                for m in range(model_count)
+            ]
+        })
+    return brands
+
+def package(index: int, brands: list) -> dict:
+    base = random.randint(8, 60) * 100
+    pricing = {"brands": {}}
+    for brand in brands:
+        models = {}
+        for model in brand["models"]:
+            models[model["name"]] = {"fuelTypes": {
+                fuel: {
+                    "basePrice": base + random.randint(0, 20) * 50,
+                    "discountedPrice": base,
+                    "Extra": "",
+                    "Extra1": ""
+                }
+                for fuel in model["fuel_types"]
+            }}
+        pricing["brands"][brand["brand"]] = {"models": models}
+    return {
+        "name": f"Package {index:03d}",
+        "warranty": "1 Month / 1000 Kms",
+        "interval": "Every 5000 Kms or 3 Months",
+        "services": [f"Service item {i}" for i in range(8)],
+        "duration": "4 Hrs",
+        "recommended": index % 5 == 0,
+        "category": CATEGORIES[index % len(CATEGORIES)],
+        "pricing": pricing
+    }
+
+def booking(brands: list, packages: list, created: datetime) -> dict:
+    brand = random.choice(brands)
+    model = random.choice(brand["models"])
+    items = [
+        {"packageName": p["name"], "price": float(random.randint(8, 60) * 100), "quantity": 1}
+        for p in random.sample(packages, random.randint(1, 3))
+    ]
+    return {
+        "brand": brand["brand"],
+        "model": model["name"],
+        "fuelType": model["fuel_types"][0],
+        "year": str(random.randint(2010, 2024)),
+        "phone": f"9{random.randint(0, 999999999):09d}",
+        "date": (created + timedelta(days=random.randint(1, 10))).strftime("%Y-%m-%d"),
+        "time": random.choice(SLOT_TIMES),
+        "address": "12 Bench Street, Bengaluru",
+        "alternatePhone": "",
+        "serviceCenter": random.choice(SERVICE_CENTERS),
+        "totalPrice": sum(i["price"] * i["quantity"] for i in items),
+        "cartItems": items,
+        "status": random.choice(STATUSES),
+        "createdAt": created
+    }
+
+def seed(db, brand_count: int, model_count: int, package_count: int, booking_count: int, seed_value: int = 7):
+    random.seed(seed_value)
+    for name in ("brands", "service_packages", "package_prices", "bookings", "insurance_requests",
+                 "requests", "blog_posts", "service_centers", "slot_counters", "migrations", "booking_rollups"):
+        db[name].drop()
+
+    brands = catalog(brand_count, model_count)
+    db.brands.insert_many(brands)
+
+    # Each package prices a subset of brands, as in production
+    packages = []
+    for i in range(package_count):
+        subset = random.sample(brands, max(1, len(brands) // 2))
+        packages.append(package(i, subset))
+        db.service_packages.insert_one(packages[-1])
+        packages[-1].pop("pricing")
+
+    db.service_centers.insert_many([
+        {"key": c.lower(), "name": c, "slotCapacity": 1_000_000} for c in SERVICE_CENTERS
+    ])
+
+    now = datetime.now(timezone.utc)
+    batch = []
+    for i in range(booking_count):
+        batch.append(booking(brands, packages, now - timedelta(minutes=i * 2)))
+        if len(batch) == 5000:
+            db.bookings.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db.bookings.insert_many(batch, ordered=False)
+
+    db.insurance_requests.insert_many([
+        {"brand": "Brand000", "model": "Model 000-000", "fuelType": "Petrol", "year": "2020",
+         "phone": f"9{i:09d}", "companyPolicyName": "Bench Insurance", "type": "insurance_request",
+         "status": random.choice(["new", "contacted", "closed"]),
+         "createdAt": now - timedelta(minutes=i * 7)}
+        for i in range(max(1, booking_count // 10))
+    ])
+    db.requests.insert_many([
+        {"brand": "Brand001", "model": "Model 001-001", "fuelType": "Diesel", "year": "2019",
+         "phone": f"8{i:09d}", "createdAt": now - timedelta(minutes=i * 9)}
+        for i in range(max(1, booking_count // 10))
+    ])
+    db.blog_posts.insert_many([
+        {"title": f"Bench post {i}", "content": "Lorem ipsum " * 200, "excerpt": "Lorem ipsum",
+         "author": "Bench", "authorRole": "Writer", "image": "/media/blog/post.png", "readTime": "5 min",
+         "date": now.strftime("%B %d, %Y"), "slug": f"bench-post-{i}"}
+        for i in range(50)
+    ])
+
+def load_context(db) -> dict:
+    """What the load scenarios need to build valid requests against a seeded database"""
+    packages = {
+        str(p["_id"]): {"name": p["name"], "category": p.get("category"), "brands": []}
+        for p in db.service_packages.find({}, {"name": 1, "category": 1})
+    }
+    for group in db.package_prices.aggregate([
+        {"$group": {"_id": "$package_id", "brands": {"$addToSet": "$brand"}}}
+    ]):
+        if group["_id"] in packages:
+            packages[group["_id"]]["brands"] = group["brands"]
+    return {
+        "brands": list(db.brands.find({}, {"_id": 0, "brand": 1, "models": 1})),
+        "packages": [p for p in packages.values() if p["brands"]],
+        "service_centers": SERVICE_CENTERS,
+        "slot_times": SLOT_TIMES
+    }
+
+def migrate_prices():
+    # Imported late: the app modules connect on import and read the environment
+    from app.migrations.package_prices import migrate
+    from app.migrations.booking_rollups import rebuild
+    migrate(restart=True)
+    rebuild()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=os.getenv("DB_NAME", "drvyn_bench"))
+    parser.add_argument("--brands", type=int, default=60)
+    parser.add_argument("--models", type=int, default=40)
+    parser.add_argument("--packages", type=int, default=30)
+    parser.add_argument("--bookings", type=int, default=200_000)
+    args = parser.parse_args()
+
+    seed(MongoClient(args.uri)[args.db], args.brands, args.models, args.packages, args.bookings)
+    os.environ.update({"MONGODB_URI": args.uri, "DB_NAME": args.db, "MONGODB_TLS": "false"})
+    migrate_prices()
+
+if __name__ == "__main__":
+    main()
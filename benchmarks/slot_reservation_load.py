@@ -0,0 +1,70 @@
+"""Parallel load test for slot reservation.
+
+Fires many concurrent reservations at a handful of slots on a local mongod
+and checks that no slot is ever booked past its capacity.
+
+    python -m benchmarks.slot_reservation_load [--workers 64] [--attempts 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGODB_TLS", "false")
+os.environ.setdefault("DB_NAME", "drvyn_bench")
+
+from app.database.connection import db  # noqa: E402
+from app.database.indexes import ensure_indexes  # noqa: E402
+from app.services.slot_service import reserve_slot  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--capacity", type=int, default=5)
+    parser.add_argument("--slots", type=int, default=10)
+    args = parser.parse_args()
+
+    ensure_indexes()
+    db.slot_counters.delete_many({"center_key": "load test center"})
+    db.service_centers.update_one(
+        {"key": "load test center"},
+        {"$set": {"name": "Load Test Center", "slotCapacity": args.capacity}},
+        upsert=True
+    )
+
+    date = "2099-01-01"
+    times = [f"slot-{i}" for i in range(args.slots)]
+
+    def attempt(_):
+        slot = random.choice(times)
+        return slot, reserve_slot("Load Test Center", date, slot)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(attempt, range(args.attempts)))
+    elapsed = time.perf_counter() - started
+
+    accepted = {}
+    for slot, ok in results:
+        if ok:
+            accepted[slot] = accepted.get(slot, 0) + 1
+
+    stored = {
+        doc["time"]: doc["booked"]
+        for doc in db.slot_counters.find({"center_key": "load test center", "date": date})
+    }
+    overbooked = {s: n for s, n in accepted.items() if n > args.capacity or stored.get(s) != n}
+
+    print(f"{args.attempts} reservations in {elapsed:.2f}s "
+          f"({args.attempts / elapsed:.0f}/s), accepted {sum(accepted.values())}")
+    if overbooked:
+        print(f"FAIL: inconsistent slots {overbooked} (stored {stored})")
+        sys.exit(1)
+    print("OK: no slot exceeded its capacity")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Minimal SMTP server that accepts and discards mail, for benchmark runs."""
+import asyncio
+import threading
+
+class SMTPSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages = 0
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+
+    async def _handle(self, reader, writer):
+        writer.write(b"220 bench-sink ESMTP\r\n")
+        in_data = False
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.messages += 1
+                    writer.write(b"250 OK queued\r\n")
+                continue
+            command = line[:4].upper()
+            if command == b"EHLO":
+                writer.write(b"250-bench-sink\r\n250 AUTH PLAIN LOGIN\r\n")
+            elif command == b"HELO":
+                writer.write(b"250 bench-sink\r\n")
+            elif command == b"AUTH":
+                writer.write(b"235 Authentication successful\r\n")
+            elif command == b"DATA":
+                in_data = True
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self) -> int:
+        threading.Thread(target=self._run, name="smtp-sink", daemon=True).start()
+        self._ready.wait()
+        return self.port
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)